@@ -1,4 +1,5 @@
 import logging
+from pathlib import Path
 
 from ._config import Config, load_sheets_config
 
@@ -21,7 +22,9 @@ logger = logging.getLogger(__name__)
 config = Config.from_env()
 
 # Loaded at import time; exits on invalid config
-sheets_config = load_sheets_config()
+sheets_config = load_sheets_config(
+    Path(config.SHEETS_CONFIG_PATH) if config.SHEETS_CONFIG_PATH else None
+)
 
 
 __all__ = ["config", "logger", "sheets_config"]
@@ -2,6 +2,7 @@ import os
 import sys
 import yaml
 from pathlib import Path
+from typing import Literal
 
 from dotenv import load_dotenv
 from pydantic import BaseModel, ValidationError
@@ -12,23 +13,101 @@ class Config(BaseModel):
     KEYS_FOLDER_PATH: str  # Path to folder containing service account JSON key files for rotation pool
 
     LAPAK_API_KEY: str  # Lapakgaming API Bearer token
+    LAPAKGAMING_BASE_URL: str = (
+        "https://www.lapakgaming.com"  # Point at fakes/lapak_server.py for load tests
+    )
 
     PROCESS_BATCH_SIZE: int  # Number of rows per batch for logging sheets
     PARALLEL_BATCH_COUNT: (
         int  # Number of batches to process concurrently for logging sheets (e.g. 4)
     )
+    LOG_SNAPSHOT_MAX_ROWS: int = (
+        0  # Read logging sheets of up to this many rows in a single request (0 = off)
+    )
 
     LISTING_BATCH_SIZE: int  # Number of rows per batch for listing sheets
     LISTING_PARALLEL_BATCH_COUNT: (
         int  # Number of batches to process concurrently for listing sheets (e.g. 4)
     )
+    LISTING_SYNC_MODE: Literal["full", "diff"] = (
+        "full"  # "full" rewrites every listing row; "diff" writes only changed rows
+    )
 
     RATE_LIMIT_WAIT_SECONDS: (
-        float  # Seconds to wait after all keys in the pool have hit 429 (e.g. 60.0)
+        float  # Seconds a key cools down after hitting 429 (e.g. 60.0)
+    )
+    KEY_FORBIDDEN_COOLDOWN_SECONDS: float = (
+        300  # Seconds a key is skipped after returning 403
+    )
+
+    SHEETS_BASE_URL: str = (
+        "https://sheets.googleapis.com/v4/spreadsheets"  # Point at a fake server for load tests
+    )
+    GOOGLE_TOKEN_URL: str = (
+        "https://oauth2.googleapis.com/token"  # OAuth2 token endpoint for service-account JWTs
+    )
+
+    SHEETS_MAX_CONCURRENT_REQUESTS: int = (
+        8  # Global cap on in-flight Google Sheets requests, shared by all sheets
+    )
+
+    SHEETS_READ_REQUESTS_PER_MINUTE: float = (
+        55  # Client-side read quota per service-account key; 0 disables pacing
+    )
+    SHEETS_WRITE_REQUESTS_PER_MINUTE: float = (
+        55  # Client-side write quota per service-account key; 0 disables pacing
+    )
+    SHEETS_RATE_LIMIT_BURST: int = (
+        5  # Requests a key may send back-to-back before pacing kicks in
+    )
+
+    SHEETS_WRITE_COALESCE: bool = (
+        False  # Merge concurrent batch_update calls per spreadsheet into one request
+    )
+    SHEETS_WRITE_COALESCE_MAX_RANGES: int = (
+        500  # Buffered ranges that trigger an early flush
+    )
+    SHEETS_STRUCTURED_WRITES: bool = (
+        False  # Commit a listing sheet's writes and clears via spreadsheets:batchUpdate
+    )
+
+    LAPAK_STREAM_PARSE: bool = (
+        False  # Parse Lapakgaming product lists while the response streams in
     )
 
     RELAX_AFTER_EACH_ROUND: float = 60
 
+    SKIP_UNCHANGED_ROUNDS: bool = (
+        False  # Skip the Sheets work of a round when no country's catalog changed
+    )
+    MAX_SKIPPED_ROUNDS: int = (
+        10  # Run a full round after this many consecutive skipped rounds
+    )
+
+    ALWAYS_WRITE_NOTE: bool = (
+        False  # Rewrite note columns every round even when only their timestamp changed
+    )
+
+    ROW_RESULT_CACHE_PATH: str | None = (
+        None  # JSON file that keeps per-row pricing results across restarts
+    )
+
+    METRICS_PORT: int | None = (
+        None  # Serve Prometheus metrics on http://METRICS_HOST:METRICS_PORT/metrics
+    )
+    METRICS_HOST: str = (
+        "127.0.0.1"  # Interface for the metrics endpoint; 0.0.0.0 exposes it on all of them
+    )
+
+    TRACE_DIR: str | None = (
+        None  # Write a Chrome trace-event JSON file per round into this folder
+    )
+    TRACE_KEEP_ROUNDS: int = 50  # Trace files kept in TRACE_DIR (0 = keep all)
+
+    SHEETS_CONFIG_PATH: str | None = (
+        None  # sheets_config.yaml to load instead of the one at the project root
+    )
+
     @staticmethod
     def from_env(dotenv_path: str = "settings.env") -> "Config":
         load_dotenv(dotenv_path)
@@ -1,41 +1,116 @@
-from typing import Final
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
 
 import httpx
 
 from .. import config
 from . import logger
+from .catalog import ProductCatalog
 from .models import ProductResponse, Response
+from .streaming import iter_json_array_items
 from ..shared.retry_policies import LAPAK_API_RETRY
-
-LAPAKGAMING_BASE_URL: Final[str] = "https://www.lapakgaming.com"
+from ..shared.tracing import tracer
 
 
 class LapakgamingAPIClient:
     def __init__(self) -> None:
         self.client = httpx.AsyncClient(timeout=30.0)
-        self.base_url = LAPAKGAMING_BASE_URL
+        self.base_url = config.LAPAKGAMING_BASE_URL.rstrip("/")
 
-    @LAPAK_API_RETRY
-    async def get_all_products(self, country_code: str = "id") -> Response[ProductResponse]:
-        logger.info(f"LapakgamingAPIClient.get_all_products: country_code={country_code}")
+    @asynccontextmanager
+    async def _all_products_response(
+        self,
+        country_code: str,
+        etag: str | None,
+        stream: bool,
+    ) -> AsyncIterator[httpx.Response]:
+        """GET /api/all-products and yield the response with its body still unread.
 
+        Sends If-None-Match when `etag` is known. Error statuses other than 304 are
+        logged and raised as httpx.HTTPStatusError for LAPAK_API_RETRY.
+        """
         headers = {
             "Authorization": f"Bearer {config.LAPAK_API_KEY}",
         }
+        if etag:
+            headers["If-None-Match"] = etag
 
-        res = await self.client.get(
-            f"{self.base_url}/api/all-products?country_code={country_code}",
-            headers=headers,
+        with tracer.span(
+            "lapak.http.all_products", "lapak", country_code=country_code, stream=stream
+        ) as span:
+            async with self.client.stream(
+                "GET",
+                f"{self.base_url}/api/all-products?country_code={country_code}",
+                headers=headers,
+            ) as res:
+                span.set(status=res.status_code)
+                if res.status_code != httpx.codes.NOT_MODIFIED:
+                    try:
+                        res.raise_for_status()
+                    except httpx.HTTPStatusError:
+                        await res.aread()
+                        logger.error(
+                            f"LapakgamingAPIClient: HTTP {res.status_code} error on {res.url.path}"
+                        )
+                        logger.debug(
+                            f"LapakgamingAPIClient: response body length={len(res.text)}"
+                        )
+                        raise
+                yield res
+
+    @LAPAK_API_RETRY
+    async def get_all_products_if_changed(
+        self,
+        country_code: str = "id",
+        etag: str | None = None,
+    ) -> tuple[Response[ProductResponse] | None, str | None]:
+        """Fetch products, sending If-None-Match when the ETag of a previous fetch is known.
+
+        Returns:
+            (None, etag) when the server answers 304 Not Modified, otherwise the parsed
+            response and its ETag (None when the server does not send one).
+        """
+        logger.info(
+            f"LapakgamingAPIClient.get_all_products_if_changed: country_code={country_code} "
+            f"etag={'yes' if etag else 'no'}"
         )
 
-        try:
-            res.raise_for_status()
-        except httpx.HTTPStatusError:
-            logger.error(f"LapakgamingAPIClient: HTTP {res.status_code} error on {res.url.path}")
-            logger.debug(f"LapakgamingAPIClient: response body length={len(res.text)}")
-            raise
+        async with self._all_products_response(country_code, etag, stream=False) as res:
+            if res.status_code == httpx.codes.NOT_MODIFIED:
+                return None, etag
+            await res.aread()
+
+        return (
+            Response[ProductResponse].model_validate(res.json()),
+            res.headers.get("ETag"),
+        )
+
+    @LAPAK_API_RETRY
+    async def stream_all_products_if_changed(
+        self,
+        country_code: str = "id",
+        etag: str | None = None,
+    ) -> tuple[ProductCatalog | None, str | None]:
+        """Like `get_all_products_if_changed`, but parse products straight into a catalog
+        while the body streams in, without buffering the whole response.
+
+        Returns:
+            (None, etag) on 304 Not Modified, otherwise the catalog and its ETag.
+        """
+        logger.info(
+            f"LapakgamingAPIClient.stream_all_products_if_changed: country_code={country_code} "
+            f"etag={'yes' if etag else 'no'}"
+        )
+
+        async with self._all_products_response(country_code, etag, stream=True) as res:
+            if res.status_code == httpx.codes.NOT_MODIFIED:
+                return None, etag
+
+            catalog = ProductCatalog()
+            async for record in iter_json_array_items(res.aiter_bytes(), "products"):
+                catalog.append_record(record)
 
-        return Response[ProductResponse].model_validate(res.json())
+            return catalog, res.headers.get("ETag")
 
 
 lapakgaming_api_client = LapakgamingAPIClient()
@@ -0,0 +1,147 @@
+from array import array
+from sys import intern
+from typing import Any, Callable, Final, Iterable, Iterator, Sequence
+
+from .models import Product
+
+STR_FIELDS: Final[tuple[str, ...]] = (
+    "code",
+    "category_code",
+    "name",
+    "provider_code",
+    "country_code",
+    "status",
+)
+INT_FIELDS: Final[tuple[str, ...]] = ("price", "process_time")
+FIELDS: Final[tuple[str, ...]] = tuple(Product.model_fields)
+
+
+class ProductCatalog:
+    """Column-wise store of Lapakgaming products.
+
+    String columns hold interned strings (category, provider, country and status repeat
+    across thousands of products), price and process_time live in `array('q')`. Products
+    are only materialised as `Product` objects when a caller asks for one.
+
+    A code maps to the last row carrying it, like building a {code: product} dict.
+    """
+
+    def __init__(self) -> None:
+        self._str_columns: dict[str, list[str]] = {field: [] for field in STR_FIELDS}
+        self._int_columns: dict[str, array] = {field: array("q") for field in INT_FIELDS}
+        self._row_by_code: dict[str, int] = {}
+
+    @classmethod
+    def from_products(cls, products: Iterable[Product]) -> "ProductCatalog":
+        catalog = cls()
+        for product in products:
+            catalog.append(**{field: getattr(product, field) for field in FIELDS})
+        return catalog
+
+    @classmethod
+    def concat(cls, catalogs: Iterable["ProductCatalog"]) -> "ProductCatalog":
+        """Join catalogs end to end, keeping row order."""
+        result = cls()
+        for catalog in catalogs:
+            offset = len(result)
+            for field in STR_FIELDS:
+                result._str_columns[field].extend(catalog._str_columns[field])
+            for field in INT_FIELDS:
+                result._int_columns[field].extend(catalog._int_columns[field])
+            for row, code in enumerate(catalog._str_columns["code"]):
+                result._row_by_code[code] = offset + row
+        return result
+
+    def append(self, **values: Any) -> int:
+        """Add one product given as field values; returns its row."""
+        row = len(self)
+        for field in STR_FIELDS:
+            self._str_columns[field].append(intern(values[field]))
+        for field in INT_FIELDS:
+            self._int_columns[field].append(values[field])
+        self._row_by_code[values["code"]] = row
+        return row
+
+    def append_record(self, record: dict[str, Any]) -> int:
+        """Add one product from a decoded JSON object; returns its row.
+
+        Records that already have the exact types are stored as-is; anything else goes
+        through full `Product` validation (coercion, or a ValidationError).
+        """
+        if all(type(record.get(field)) is str for field in STR_FIELDS) and all(
+            type(record.get(field)) is int for field in INT_FIELDS
+        ):
+            return self.append(**record)
+        return self.append(**Product.model_validate(record).model_dump())
+
+    def __len__(self) -> int:
+        return len(self._str_columns["code"])
+
+    def __contains__(self, code: object) -> bool:
+        return code in self._row_by_code
+
+    def __iter__(self) -> Iterator[Product]:
+        return (self.product(row) for row in range(len(self)))
+
+    def column(self, field: str) -> Sequence[Any]:
+        """The raw column of a field (shared, do not mutate)."""
+        if field in self._int_columns:
+            return self._int_columns[field]
+        return self._str_columns[field]
+
+    def value(self, row: int, field: str) -> Any:
+        return self.column(field)[row]
+
+    def row_of(self, code: str) -> int | None:
+        return self._row_by_code.get(code)
+
+    def rows(self) -> Iterator[tuple]:
+        """Every product as a tuple of values in `FIELDS` order."""
+        return zip(*(self.column(field) for field in FIELDS))
+
+    def row_values(self, row: int) -> tuple:
+        """One product as a tuple of values in `FIELDS` order."""
+        return tuple(self.column(field)[row] for field in FIELDS)
+
+    def product(self, row: int) -> Product:
+        return Product.model_construct(
+            **{field: self.column(field)[row] for field in FIELDS}
+        )
+
+    def get(self, code: str) -> Product | None:
+        row = self._row_by_code.get(code)
+        return None if row is None else self.product(row)
+
+    def view(self, rows: Iterable[int] | None = None) -> "CatalogView":
+        """A view over `rows` (all rows by default)."""
+        if rows is None:
+            rows = range(len(self))
+        return CatalogView(self, array("q", rows))
+
+
+class CatalogView:
+    """An ordered selection of rows of a ProductCatalog."""
+
+    def __init__(self, catalog: ProductCatalog, rows: array) -> None:
+        self.catalog = catalog
+        self.rows = rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __iter__(self) -> Iterator[Product]:
+        return (self.catalog.product(row) for row in self.rows)
+
+    def column(self, field: str) -> list[Any]:
+        column = self.catalog.column(field)
+        return [column[row] for row in self.rows]
+
+    def where(self, mask: Iterable[bool]) -> "CatalogView":
+        """Rows whose mask entry is true; `mask` runs parallel to this view."""
+        return CatalogView(
+            self.catalog,
+            array("q", (row for row, keep in zip(self.rows, mask) if keep)),
+        )
+
+    def filter(self, predicate: Callable[[Product], bool]) -> "CatalogView":
+        return self.where(predicate(product) for product in self)
@@ -0,0 +1,76 @@
+import hashlib
+
+from pydantic import BaseModel, ConfigDict
+
+from . import logger
+from .catalog import ProductCatalog
+
+
+def catalog_fingerprint(catalog: ProductCatalog) -> str:
+    """Content hash of a country's catalog.
+
+    Covers every product field, in catalog order, since the listing sheets write most of
+    them and keep the API's ordering.
+    """
+    digest = hashlib.sha256()
+    for row in catalog.rows():
+        digest.update(repr(row).encode())
+    return digest.hexdigest()
+
+
+class CountryCatalog(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    catalog: ProductCatalog
+    fingerprint: str
+    etag: str | None = None
+
+
+class CatalogChangeTracker:
+    """Remember each country's last catalog so unchanged countries can be recognised and reused."""
+
+    def __init__(self) -> None:
+        self._catalogs: dict[str, CountryCatalog] = {}
+
+    def etag(self, country_code: str) -> str | None:
+        entry = self._catalogs.get(country_code)
+        return entry.etag if entry else None
+
+    def reuse(self, country_code: str) -> ProductCatalog | None:
+        """Return the previously seen catalog (e.g. after a 304 Not Modified), if any."""
+        entry = self._catalogs.get(country_code)
+        return entry.catalog if entry else None
+
+    def record(
+        self,
+        country_code: str,
+        catalog: ProductCatalog,
+        etag: str | None = None,
+    ) -> tuple[ProductCatalog, bool]:
+        """Store a freshly fetched catalog.
+
+        Returns:
+            The catalog to use (the previous object when the content is unchanged) and
+            whether it changed since the last fetch.
+        """
+        fingerprint = catalog_fingerprint(catalog)
+        previous = self._catalogs.get(country_code)
+        if previous is not None and previous.fingerprint == fingerprint:
+            previous.etag = etag
+            return previous.catalog, False
+
+        self._catalogs[country_code] = CountryCatalog(
+            catalog=catalog, fingerprint=fingerprint, etag=etag
+        )
+        logger.info(
+            f"CatalogChangeTracker.record: country_code={country_code} catalog changed "
+            f"(products={len(catalog)})"
+        )
+        return catalog, True
+
+    def invalidate(self, country_code: str) -> None:
+        """Forget a country, so its next fetch counts as a change (e.g. after a failed fetch)."""
+        self._catalogs.pop(country_code, None)
+
+
+catalog_change_tracker = CatalogChangeTracker()
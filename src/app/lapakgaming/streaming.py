@@ -0,0 +1,73 @@
+import codecs
+import json
+import re
+from typing import Any, AsyncIterator
+
+_WHITESPACE = re.compile(r"\s*")
+
+
+async def iter_json_array_items(
+    chunks: AsyncIterator[bytes],
+    key: str,
+) -> AsyncIterator[Any]:
+    """Yield the items of the first JSON array stored under `key`, as the body streams in.
+
+    Items are expected to be objects (or other bracketed values); a bare number cut by a
+    chunk boundary would be decoded early. Only the array items are decoded; everything
+    before the array is skipped and everything after it is ignored. At most one unfinished
+    item is buffered at a time, so memory stays flat regardless of the array length.
+
+    Raises:
+        ValueError: If the stream ends before the array does, or an item is malformed.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    array_start = re.compile(rf'"{re.escape(key)}"\s*:\s*\[')
+
+    buffer = ""
+    pos = 0
+    in_array = False
+    exhausted = False
+    chunk_iter = chunks.__aiter__()
+
+    while True:
+        if not in_array:
+            match = array_start.search(buffer)
+            if match:
+                in_array = True
+                pos = match.end()
+            else:
+                # Keep a tail long enough to hold a key split across chunks
+                buffer = buffer[-(len(key) + 64) :]
+        if in_array:
+            while True:
+                pos = _WHITESPACE.match(buffer, pos).end()
+                if pos < len(buffer) and buffer[pos] == ",":
+                    pos = _WHITESPACE.match(buffer, pos + 1).end()
+                if pos >= len(buffer):
+                    break
+                if buffer[pos] == "]":
+                    return
+                try:
+                    item, pos = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if exhausted:
+                        raise ValueError(
+                            f"iter_json_array_items: malformed or truncated item at offset {pos}"
+                        )
+                    break
+                yield item
+            buffer = buffer[pos:]
+            pos = 0
+
+        if exhausted:
+            raise ValueError(
+                f"iter_json_array_items: stream ended inside or before array '{key}'"
+            )
+        try:
+            chunk = await chunk_iter.__anext__()
+        except StopAsyncIteration:
+            exhausted = True
+            buffer += text_decoder.decode(b"", final=True)
+        else:
+            buffer += text_decoder.decode(chunk)
@@ -1,6 +1,8 @@
 from datetime import datetime
-from typing import Final
+from typing import Any, Final
 import asyncio
+import hashlib
+import time
 
 from pydantic import BaseModel
 
@@ -8,9 +10,11 @@ from app import config, logger
 
 # Removed: fri_a1_range_to_grid_range was used only in the removed find_cell_to_update function
 # from app.sheet.utils import fri_a1_range_to_grid_range
-from .sheet import async_sheets_client
+from .sheet import async_sheets_client, sheets_rate_limiter
 
 from .lapakgaming.api_client import lapakgaming_api_client
+from .lapakgaming.catalog import CatalogView, ProductCatalog
+from .lapakgaming.change_detection import catalog_change_tracker
 from .lapakgaming.consts import COUNTRY_CODES
 from .lapakgaming.models import Product as LapakgamingProduct
 
@@ -20,7 +24,24 @@ from .lapakgaming.models import Product as LapakgamingProduct
 # from .sheet.models import BatchCellUpdatePayload
 from .sheet.models import RowModel, ListingRowModel
 from ._config import SheetEntry
-from .utils import note_message, split_list, derive_codes_for_row, formated_datetime
+from .row_cache import RowResult, row_result_cache
+from .shared.concurrency import run_sliding_window
+from .shared.metrics import (
+    catalog_products,
+    lapak_fetch_seconds,
+    round_seconds,
+    sheet_rows,
+)
+from .shared.tracing import traced, tracer
+from .utils import (
+    note_message,
+    split_list,
+    formated_datetime,
+    stable_layout,
+    strip_note_timestamp,
+    ListingCodeIndex,
+    ListingKeywordMatcher,
+)
 
 SEPERATED_CHAR: Final[str] = ","
 
@@ -28,6 +49,16 @@ LISTING_START_ROW: Final[int] = 4
 LOG_START_ROW: Final[int] = 3
 
 
+# Listing sheet contents (row values from LISTING_START_ROW) as of the last diff sync,
+# keyed by (spreadsheet_id, sheet name). Dropped whenever a sync fails part-way.
+_listing_sheet_contents: dict[tuple[str, str], list[dict[str, Any]]] = {}
+
+# Consecutive rounds skipped because the catalog did not change, and whether the last
+# round that did run finished every sheet without an unhandled error.
+_skipped_rounds: int = 0
+_last_round_complete: bool = False
+
+
 class InExKeywordMapping(BaseModel):
     include_keywords: dict[str, list[str] | None]
     exclude_keywords: dict[str, list[str] | None]
@@ -47,12 +78,6 @@ class InExKeywordMapping(BaseModel):
 #     return f"{col_str}{row}"
 
 
-def to_product_dict(
-    products: list[LapakgamingProduct],
-) -> dict[str, LapakgamingProduct]:
-    return {product.code: product for product in products}
-
-
 def product_code_from_str(
     str_code: str,
 ) -> list[str]:
@@ -255,99 +280,268 @@ def min_lapakgaming_products(
 #             )
 
 
-async def batch_process(
-    lapakgaming_product_dict: dict[str, LapakgamingProduct],
-    indexes: list[int],
-    sheet_id: str,
-    sheet_name: str,
-    listing_codes: list[str | None],
-    listing_country_codes: list[str | None],
-):
-    # Get all run row from sheet
-    logger.info(
-        f"batch_process: reading rows {indexes[0]}–{indexes[-1]} from {sheet_name}"
-    )
-    row_models = await RowModel.batch_get(
-        sheet_id=sheet_id,
-        sheet_name=sheet_name,
-        indexes=indexes,
-    )
+class RowPricing(BaseModel):
+    """Pricing outcome shared by all logging rows with the same prefix and country filter."""
 
-    # Process for each row model
-    for row_model in row_models:
+    code: str
+    stamp: str
+    products: list[LapakgamingProduct]
+    min_price_product: LapakgamingProduct | None
+    other_products: list[LapakgamingProduct]
+
+
+class RoundPricingIndex:
+    """Per-round memo of code derivation and min-price selection, shared by all logging sheets.
+
+    Logging rows are resolved by their (Code_Prefix, country_code_priority) pair, which
+    fully determines the outcome within a round, so sheets tracking the same games cost
+    one computation per pair instead of one per row.
+    """
+
+    def __init__(
+        self,
+        lapakgaming_catalog: ProductCatalog,
+        listing_index: ListingCodeIndex,
+    ) -> None:
+        self.lapakgaming_catalog = lapakgaming_catalog
+        self.listing_index = listing_index
+        self._pricing: dict[tuple[str | None, str | None], RowPricing] = {}
+
+    def __len__(self) -> int:
+        return len(self._pricing)
+
+    def resolve(self, row_model: RowModel) -> RowPricing:
+        key = (row_model.Code_Prefix, row_model.country_code_priority)
+        pricing = self._pricing.get(key)
+        if pricing is None:
+            pricing = self._pricing[key] = self._compute(row_model)
+        return pricing
+
+    def _compute(self, row_model: RowModel) -> RowPricing:
         # Derive product codes from listing data
-        codes = derive_codes_for_row(
+        codes = self.listing_index.derive_codes(
             col_a_prefix=row_model.Code_Prefix,
             col_f_country_filter=row_model.country_code_priority,
-            listing_codes=listing_codes,
-            listing_country_codes=listing_country_codes,
         )
-        row_model.code = SEPERATED_CHAR.join(codes)
+        code = SEPERATED_CHAR.join(codes)
 
-        product_codes = product_code_from_str(row_model.code)
-        __products = [
-            lapakgaming_product_dict[code]
-            for code in product_codes
-            if code in lapakgaming_product_dict
+        product_codes = product_code_from_str(code)
+        products = [
+            product
+            for product in map(self.lapakgaming_catalog.get, product_codes)
+            if product is not None
         ]
 
         min_price_product = min_lapakgaming_products(
-            row_model=row_model, lapakgaming_products=__products
+            row_model=row_model, lapakgaming_products=products
+        )
+        other_products = (
+            products
+            if min_price_product is None
+            else [
+                product
+                for product in products
+                if product.code != min_price_product.code
+            ]
+        )
+        return RowPricing(
+            code=code,
+            stamp=row_stamp(self.lapakgaming_catalog, code, product_codes),
+            products=products,
+            min_price_product=min_price_product,
+            other_products=other_products,
+        )
+
+
+def row_stamp(
+    lapakgaming_catalog: ProductCatalog,
+    code: str,
+    product_codes: list[str],
+) -> str:
+    """Digest of a row's derived codes and the current values of its matched products."""
+    values = [
+        lapakgaming_catalog.row_values(row)
+        for row in map(lapakgaming_catalog.row_of, product_codes)
+        if row is not None
+    ]
+    return hashlib.blake2b(repr((code, values)).encode(), digest_size=16).hexdigest()
+
+
+@traced(
+    "logging",
+    lambda a: {
+        "sheet": a["sheet_name"],
+        "rows": f"{a['indexes'][0]}-{a['indexes'][-1]}",
+    },
+)
+async def batch_process(
+    pricing_index: RoundPricingIndex,
+    indexes: list[int],
+    sheet_id: str,
+    sheet_name: str,
+    snapshot: dict[int, dict[str, Any]] | None = None,
+):
+    # Get all run row from sheet, unless the whole sheet was already read
+    if snapshot is None:
+        logger.info(
+            f"batch_process: reading rows {indexes[0]}–{indexes[-1]} from {sheet_name}"
+        )
+        row_models = await RowModel.batch_get(
+            sheet_id=sheet_id,
+            sheet_name=sheet_name,
+            indexes=indexes,
+        )
+    else:
+        row_models = await RowModel.from_rows(
+            sheet_id=sheet_id,
+            sheet_name=sheet_name,
+            indexes=indexes,
+            rows=snapshot,
         )
 
+    # Process for each row model
+    computed: list[tuple[int, RowResult]] = []
+    cache_hits = 0
+    for row_model in row_models:
+        pricing = pricing_index.resolve(row_model)
+        row_model.code = pricing.code
+
+        # Same inputs and same matched products as a previous round: reuse its result
+        cached = row_result_cache.get(
+            sheet_id,
+            sheet_name,
+            row_model.index,
+            row_model.Code_Prefix,
+            row_model.country_code_priority,
+            pricing.stamp,
+        )
+        if cached is not None:
+            cache_hits += 1
+            row_model.LOWEST_PRICE = cached.LOWEST_PRICE
+            row_model.NOTE = f"{formated_datetime(datetime.now())} {cached.NOTE}"
+            row_model.LOG_CODE = cached.LOG_CODE
+            row_model.LOG_COUNTRY = cached.LOG_COUNTRY
+            continue
+
+        min_price_product = pricing.min_price_product
+        row_model.NOTE = note_message(
+            datetime.now(), min_price_product, pricing.other_products
+        )
         if min_price_product is None:
             row_model.LOWEST_PRICE = ""
-            row_model.NOTE = note_message(datetime.now(), min_price_product, __products)
             row_model.LOG_CODE = ""
             row_model.LOG_COUNTRY = ""
 
         else:
             row_model.LOWEST_PRICE = str(min_price_product.price)
-            row_model.NOTE = note_message(
-                datetime.now(),
-                min_price_product,
-                [
-                    product
-                    for product in __products
-                    if product.code != min_price_product.code
-                ],
-            )
             row_model.LOG_CODE = min_price_product.code
             row_model.LOG_COUNTRY = min_price_product.country_code
 
+        computed.append(
+            (
+                row_model.index,
+                RowResult(
+                    Code_Prefix=row_model.Code_Prefix,
+                    country_code_priority=row_model.country_code_priority,
+                    stamp=pricing.stamp,
+                    code=row_model.code,
+                    LOWEST_PRICE=row_model.LOWEST_PRICE,
+                    NOTE=strip_note_timestamp(row_model.NOTE),
+                    LOG_CODE=row_model.LOG_CODE,
+                    LOG_COUNTRY=row_model.LOG_COUNTRY,
+                ),
+            )
+        )
+
     logger.info(f"batch_process: writing sheet for rows {indexes[0]}–{indexes[-1]}")
-    await RowModel.batch_update(
+    rows_written = await RowModel.batch_update(
         sheet_id=sheet_id,
         sheet_name=sheet_name,
         list_object=row_models,
     )
 
+    # Only remember results that made it to the sheet
+    for index, result in computed:
+        row_result_cache.put(sheet_id, sheet_name, index, result)
+
+    sheet_rows.inc(
+        len(row_models),
+        spreadsheet=sheet_id[:8],
+        sheet=sheet_name,
+        outcome="processed",
+    )
+    sheet_rows.inc(
+        rows_written,
+        spreadsheet=sheet_id[:8],
+        sheet=sheet_name,
+        outcome="written",
+    )
+    sheet_rows.inc(
+        len(row_models) - rows_written,
+        spreadsheet=sheet_id[:8],
+        sheet=sheet_name,
+        outcome="skipped",
+    )
+
     logger.info(
         f"batch_process: complete — sheet={sheet_name} "
         f"rows={indexes[0]}–{indexes[-1]} "
-        f"rows_read={len(row_models)}"
+        f"rows_read={len(row_models)} cache_hits={cache_hits} rows_written={rows_written}"
     )
 
 
+async def _read_logging_snapshot(
+    sheet: SheetEntry,
+) -> dict[int, dict[str, Any]] | None:
+    """Read a logging sheet's rows from LOG_START_ROW in one request.
+
+    Returns None when snapshot mode is off, or when the sheet has more than
+    LOG_SNAPSHOT_MAX_ROWS rows (the caller then reads column A and batches as usual).
+    """
+    max_rows = config.LOG_SNAPSHOT_MAX_ROWS
+    if max_rows <= 0:
+        return None
+
+    # One row past the limit tells whether the sheet goes beyond it
+    rows = await RowModel.read_rows_from(
+        sheet.spreadsheet_id, sheet.name, LOG_START_ROW, LOG_START_ROW + max_rows
+    )
+    if len(rows) > max_rows:
+        logger.info(
+            f"process_sheet: sheet='{sheet.name}' has more than {max_rows} rows, "
+            f"falling back to batched reads"
+        )
+        return None
+    return {LOG_START_ROW + i: row for i, row in enumerate(rows)}
+
+
+@traced("logging", lambda a: {"sheet": a["sheet"].name})
 async def process_sheet(
     sheet: SheetEntry,
-    lapakgaming_product_dict: dict[str, LapakgamingProduct],
-    listing_codes: list[str | None],
-    listing_country_codes: list[str | None],
-):
-    """Process a single logging sheet: derive codes then fetch/update prices."""
+    pricing_index: RoundPricingIndex,
+) -> bool:
+    """Process a single logging sheet: derive codes then fetch/update prices.
+
+    Returns True if every batch succeeded.
+    """
     logger.info(
         f"process_sheet: starting sheet='{sheet.name}' id={sheet.spreadsheet_id[:8]}…"
     )
 
-    # Step 1: Get active run indexes from col A (non-empty value)
-    run_indexes = await RowModel.get_run_indexes(
-        sheet_id=sheet.spreadsheet_id,
-        sheet_name=sheet.name,
-    )
+    # Step 1: Get active run indexes from col A (non-empty value). In snapshot mode the
+    # whole sheet is read once and the batches are fed from memory.
+    snapshot = await _read_logging_snapshot(sheet)
+    if snapshot is not None:
+        run_indexes = RowModel.run_indexes_from_rows(snapshot)
+    else:
+        run_indexes = await RowModel.get_run_indexes(
+            sheet_id=sheet.spreadsheet_id,
+            sheet_name=sheet.name,
+        )
 
     # Filter run index
     run_indexes = [index for index in run_indexes if index >= LOG_START_ROW]
+    row_result_cache.retain(sheet.spreadsheet_id, sheet.name, run_indexes)
 
     logger.info(
         f"process_sheet: sheet='{sheet.name}' total_run_indexes={len(run_indexes)}"
@@ -355,48 +549,41 @@ async def process_sheet(
 
     if not run_indexes:
         logger.info(f"process_sheet: no active rows — sheet='{sheet.name}'")
-        return
+        return True
 
-    # Step 2: Process price updates in parallel batches (code derivation happens inside each batch)
+    # Step 2: Process price updates in parallel batches (code derivation happens inside each batch).
+    # Up to PARALLEL_BATCH_COUNT batches stay in flight; the next starts as soon as one finishes.
     batches = split_list(run_indexes, config.PROCESS_BATCH_SIZE)
-    batch_groups = split_list(batches, config.PARALLEL_BATCH_COUNT)
-    for group_idx, group in enumerate(batch_groups):
-        first_row = group[0][0] if group and group[0] else "?"
-        last_row = group[-1][-1] if group and group[-1] else "?"
-        logger.info(
-            f"process_sheet: sheet='{sheet.name}' dispatching group {group_idx + 1}/{len(batch_groups)} "
-            f"({len(group)} batches, rows {first_row}–{last_row})"
-        )
-        results = await asyncio.gather(
-            *[
-                batch_process(
-                    lapakgaming_product_dict=lapakgaming_product_dict,
-                    indexes=batch,
-                    sheet_id=sheet.spreadsheet_id,
-                    sheet_name=sheet.name,
-                    listing_codes=listing_codes,
-                    listing_country_codes=listing_country_codes,
-                )
-                for batch in group
-            ],
-            return_exceptions=True,
-        )
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                batch = group[i]
-                logger.error(
-                    f"process_sheet: batch failed — sheet='{sheet.name}' "
-                    f"rows={batch[0]}–{batch[-1]}: {result}",
-                    exc_info=result,
-                )
-        logger.info(
-            f"process_sheet: group {group_idx + 1}/{len(batch_groups)} complete — sheet='{sheet.name}'"
-        )
+    logger.info(
+        f"process_sheet: sheet='{sheet.name}' dispatching {len(batches)} batches "
+        f"(window={config.PARALLEL_BATCH_COUNT})"
+    )
+    results = await run_sliding_window(
+        batches,
+        lambda batch: batch_process(
+            pricing_index=pricing_index,
+            indexes=batch,
+            sheet_id=sheet.spreadsheet_id,
+            sheet_name=sheet.name,
+            snapshot=snapshot,
+        ),
+        config.PARALLEL_BATCH_COUNT,
+    )
+    all_ok = True
+    for batch, result in zip(batches, results):
+        if isinstance(result, Exception):
+            all_ok = False
+            logger.error(
+                f"process_sheet: batch failed — sheet='{sheet.name}' "
+                f"rows={batch[0]}–{batch[-1]}: {result}",
+                exc_info=result,
+            )
 
     logger.info(
         f"process_sheet: all batches complete — sheet='{sheet.name}' "
         f"total_run_indexes={len(run_indexes)}"
     )
+    return all_ok
 
 
 async def get_include_exclude_keywords(
@@ -450,7 +637,10 @@ def is_valid_listing_product(
     include_keywords: dict[str, list[str] | None],
     exclude_keywords: dict[str, list[str] | None],
 ) -> bool:
-    """Return True if product passes all include/exclude keyword filters."""
+    """Return True if product passes all include/exclude keyword filters.
+
+    The listing phase applies the same rules column-wise via ListingKeywordMatcher.
+    """
     for field_name, keywords in include_keywords.items():
         if keywords is not None:
             field_val = getattr(product, field_name, None) or ""
@@ -493,187 +683,588 @@ async def _clear_listing_sheet_stale_rows(
     )
 
 
-async def process_listing_sheet(
-    sheet: SheetEntry,
-    all_products: list[LapakgamingProduct],
-) -> list[LapakgamingProduct]:
-    """Process a single listing sheet: filter products by keywords and write to sheet."""
-    logger.info(
-        f"process_listing_sheet: starting sheet='{sheet.name}' id={sheet.spreadsheet_id[:8]}…"
-    )
+def _listing_row_values(product: LapakgamingProduct) -> dict[str, Any]:
+    return {
+        "code": product.code,
+        "category_code": product.category_code,
+        "name": product.name,
+        "provider_code": product.provider_code,
+        "price": str(product.price),
+        "process_time": str(product.process_time),
+        "country_code": product.country_code,
+        "status": product.status,
+    }
 
-    # Step 1: Read keyword config from rows 2 and 3
-    keyword_mapping = await get_include_exclude_keywords(
-        sheet.spreadsheet_id, sheet.name
-    )
 
-    # Step 2: Filter products
-    valid_products = [
-        p
-        for p in all_products
-        if is_valid_listing_product(
-            p, keyword_mapping.include_keywords, keyword_mapping.exclude_keywords
+def _listing_row_keys(rows: list[dict[str, Any]]) -> list[tuple]:
+    """Identify listing rows by (code, country_code, occurrence); code is "" when missing.
+
+    Every row gets a distinct key, so rows without a code are kept like any other.
+    """
+    seen: dict[tuple, int] = {}
+    keys: list[tuple] = []
+    for row in rows:
+        identity = (row.get("code") or "", row.get("country_code"))
+        seen[identity] = seen.get(identity, 0) + 1
+        keys.append((*identity, seen[identity]))
+    return keys
+
+
+async def _write_listing_rows_structured(
+    sheet: SheetEntry,
+    row_models: list[ListingRowModel],
+    clear_range: str | None,
+) -> bool:
+    """Write row models and clear `clear_range` with `spreadsheets:batchUpdate`.
+
+    Falls back to the values API (batched writes, then the clear) when the structured
+    write fails. Returns True if either path succeeded.
+    """
+    data = ListingRowModel.build_update_batch(sheet.name, row_models)
+    if not data and clear_range is None:
+        return True
+    try:
+        await async_sheets_client.write_and_clear(
+            sheet.spreadsheet_id,
+            data,
+            [clear_range] if clear_range else None,
+            max_rows=config.LISTING_BATCH_SIZE,
         )
-    ]
+    except Exception as e:
+        logger.error(
+            f"process_listing_sheet: structured write failed — sheet='{sheet.name}' "
+            f"rows={len(row_models)} clear={clear_range}: {e}; "
+            f"falling back to the values API",
+            exc_info=True,
+        )
+        all_ok = await _write_listing_rows(sheet, row_models)
+        if clear_range is not None:
+            try:
+                await async_sheets_client.batch_clear(
+                    sheet.spreadsheet_id, [clear_range]
+                )
+            except Exception as clear_error:
+                logger.error(
+                    f"process_listing_sheet: fallback clear of {clear_range} failed — "
+                    f"sheet='{sheet.name}': {clear_error}",
+                    exc_info=True,
+                )
+                return False
+        return all_ok
+
+    for row_model in row_models:
+        row_model.remember_values()
+    sheet_rows.inc(
+        len(row_models),
+        spreadsheet=sheet.spreadsheet_id[:8],
+        sheet=sheet.name,
+        outcome="written",
+    )
     logger.info(
-        f"process_listing_sheet: sheet='{sheet.name}' valid_products={len(valid_products)}"
+        f"process_listing_sheet: sheet='{sheet.name}' wrote {len(row_models)} rows "
+        f"and cleared {clear_range or 'nothing'} via spreadsheets:batchUpdate"
     )
+    return True
 
-    # Step 3: Build ListingRowModel instances starting at row 4
-    row_models: list[ListingRowModel] = []
-    for i, product in enumerate(valid_products):
-        row_models.append(
-            ListingRowModel(
-                sheet_id=sheet.spreadsheet_id,
-                sheet_name=sheet.name,
-                index=LISTING_START_ROW + i,
-                code=product.code,
-                category_code=product.category_code,
-                name=product.name,
-                provider_code=product.provider_code,
-                price=str(product.price),
-                process_time=str(product.process_time),
-                country_code=product.country_code,
-                status=product.status,
-                Note=formated_datetime(datetime.now()),
-            )
-        )
 
-    # Step 4: Write in batches
-    if row_models:
-        batches = split_list(row_models, config.LISTING_BATCH_SIZE)
-        batch_groups = split_list(batches, config.LISTING_PARALLEL_BATCH_COUNT)
+async def _write_listing_rows(
+    sheet: SheetEntry,
+    row_models: list[ListingRowModel],
+) -> bool:
+    """Write row models in batches, keeping up to LISTING_PARALLEL_BATCH_COUNT in flight.
+
+    Returns True if every batch succeeded.
+    """
+    if not row_models:
+        return True
 
-        for group_idx, group in enumerate(batch_groups):
-            first_row = group[0][0].index if group and group[0] else "?"
-            last_row = group[-1][-1].index if group and group[-1] else "?"
-            logger.info(
-                f"process_listing_sheet: sheet='{sheet.name}' dispatching group {group_idx + 1}/{len(batch_groups)} "
-                f"({len(group)} batches, rows {first_row}–{last_row})"
-            )
-            results = await asyncio.gather(
-                *[
-                    ListingRowModel.batch_update(
-                        sheet_id=sheet.spreadsheet_id,
-                        sheet_name=sheet.name,
-                        list_object=batch,
-                    )
-                    for batch in group
-                ],
-                return_exceptions=True,
+    batches = split_list(row_models, config.LISTING_BATCH_SIZE)
+    logger.info(
+        f"process_listing_sheet: sheet='{sheet.name}' dispatching {len(batches)} batches "
+        f"(window={config.LISTING_PARALLEL_BATCH_COUNT})"
+    )
+    results = await run_sliding_window(
+        batches,
+        lambda batch: ListingRowModel.batch_update(
+            sheet_id=sheet.spreadsheet_id,
+            sheet_name=sheet.name,
+            list_object=batch,
+        ),
+        config.LISTING_PARALLEL_BATCH_COUNT,
+    )
+    all_ok = True
+    for batch, result in zip(batches, results):
+        if isinstance(result, Exception):
+            all_ok = False
+            logger.error(
+                f"process_listing_sheet: batch failed — sheet='{sheet.name}' "
+                f"rows={batch[0].index}–{batch[-1].index}: {result}",
+                exc_info=result,
             )
-            for i, result in enumerate(results):
-                if isinstance(result, Exception):
-                    batch = group[i]
-                    logger.error(
-                        f"process_listing_sheet: batch failed — sheet='{sheet.name}' "
-                        f"rows={batch[0].index}–{batch[-1].index}: {result}",
-                        exc_info=result,
-                    )
-            logger.info(
-                f"process_listing_sheet: group {group_idx + 1}/{len(batch_groups)} complete — sheet='{sheet.name}'"
+        else:
+            sheet_rows.inc(
+                result,
+                spreadsheet=sheet.spreadsheet_id[:8],
+                sheet=sheet.name,
+                outcome="written",
             )
+    return all_ok
+
+
+async def _sync_listing_sheet_full(
+    sheet: SheetEntry,
+    valid_products: list[LapakgamingProduct],
+) -> bool:
+    """Rewrite every product from row 4 down, then clear the stale rows below.
+
+    Returns True if every write succeeded.
+    """
+    note = formated_datetime(datetime.now())
+    row_models = [
+        ListingRowModel(
+            sheet_id=sheet.spreadsheet_id,
+            sheet_name=sheet.name,
+            index=LISTING_START_ROW + i,
+            **_listing_row_values(product),
+            Note=note,
+        )
+        for i, product in enumerate(valid_products)
+    ]
 
-    # Step 5: Clear stale rows beyond the last written row
     clear_start = LISTING_START_ROW + len(valid_products)
+    if config.SHEETS_STRUCTURED_WRITES:
+        # An open-ended clear needs no column-B read to find the last row
+        return await _write_listing_rows_structured(
+            sheet, row_models, f"{sheet.name}!A{clear_start}:K"
+        )
+
+    all_ok = await _write_listing_rows(sheet, row_models)
+
+    # Clear stale rows beyond the last written row
     await _clear_listing_sheet_stale_rows(
         sheet_id=sheet.spreadsheet_id,
         sheet_name=sheet.name,
         start_row=clear_start,
     )
+    return all_ok
+
+
+async def _sync_listing_sheet_diff(
+    sheet: SheetEntry,
+    valid_products: list[LapakgamingProduct],
+) -> bool:
+    """Write only the listing rows that changed since the last sync, then clear the exact tail.
+
+    The current contents come from the previous successful sync, or are read once in a
+    single block. Products already on the sheet keep their row (see `stable_layout`), so
+    unchanged products cost no writes.
+
+    Returns True if every write succeeded.
+    """
+    cache_key = (sheet.spreadsheet_id, sheet.name)
+    current = _listing_sheet_contents.pop(cache_key, None)
+    if current is None:
+        current = await ListingRowModel.read_rows_from(
+            sheet.spreadsheet_id, sheet.name, LISTING_START_ROW
+        )
+
+    new_rows = [_listing_row_values(product) for product in valid_products]
+    new_keys = _listing_row_keys(new_rows)
+    rows_by_key = dict(zip(new_keys, new_rows))
+    layout = stable_layout(_listing_row_keys(current), new_keys)  # type: ignore[arg-type]
+
+    note = formated_datetime(datetime.now())
+    row_models: list[ListingRowModel] = []
+    for i, key in enumerate(layout):
+        row_model = ListingRowModel(
+            sheet_id=sheet.spreadsheet_id,
+            sheet_name=sheet.name,
+            index=LISTING_START_ROW + i,
+            **rows_by_key[key],
+            Note=note,
+        )
+        if i < len(current):
+            # Only differing fields are written; the Note timestamp follows a changed
+            # row rather than being refreshed on its own.
+            row_model.remember_values({**current[i], "Note": note})
+        row_models.append(row_model)
+
+    changed = [row_model for row_model in row_models if row_model.dirty_fields()]
+    sheet_rows.inc(
+        len(row_models) - len(changed),
+        spreadsheet=sheet.spreadsheet_id[:8],
+        sheet=sheet.name,
+        outcome="skipped",
+    )
+    logger.info(
+        f"process_listing_sheet: sheet='{sheet.name}' diff sync — "
+        f"rows={len(row_models)} changed={len(changed)} previous_rows={len(current)}"
+    )
+    clear_range = None
+    if len(current) > len(row_models):
+        clear_start = LISTING_START_ROW + len(row_models)
+        clear_end = LISTING_START_ROW + len(current) - 1
+        clear_range = f"{sheet.name}!A{clear_start}:K{clear_end}"
+
+    if config.SHEETS_STRUCTURED_WRITES:
+        all_ok = await _write_listing_rows_structured(sheet, changed, clear_range)
+    else:
+        all_ok = await _write_listing_rows(sheet, changed)
+        if clear_range is not None:
+            await async_sheets_client.batch_clear(sheet.spreadsheet_id, [clear_range])
+            logger.info(
+                f"process_listing_sheet: cleared {clear_range} on sheet='{sheet.name}'"
+            )
+
+    if all_ok:
+        mapped_fields = set(ListingRowModel.mapping_fields())
+        _listing_sheet_contents[cache_key] = [
+            row_model.model_dump(mode="json", include=mapped_fields)
+            for row_model in row_models
+        ]
+    return all_ok
+
+
+def keyword_matcher(keyword_mapping: InExKeywordMapping) -> ListingKeywordMatcher:
+    return ListingKeywordMatcher(
+        keyword_mapping.include_keywords, keyword_mapping.exclude_keywords
+    )
+
+
+def filter_listing_products(
+    products: CatalogView,
+    matcher: ListingKeywordMatcher,
+) -> CatalogView:
+    """Keep the products that pass a listing sheet's include/exclude keyword filters."""
+    if matcher.is_noop:
+        return products
+    return products.where(
+        matcher.mask(products.column, len(products), LapakgamingProduct.model_fields)
+    )
+
+
+async def read_keyword_matcher(sheet: SheetEntry) -> ListingKeywordMatcher:
+    keyword_mapping = await get_include_exclude_keywords(
+        sheet.spreadsheet_id, sheet.name
+    )
+    return keyword_matcher(keyword_mapping)
+
+
+@traced("listing", lambda a: {"sheet": a["sheet"].name})
+async def write_listing_sheet(
+    sheet: SheetEntry,
+    valid_view: CatalogView,
+) -> tuple[CatalogView, bool]:
+    """Write already-filtered products to a listing sheet from row 4 down.
+
+    Returns:
+        The catalog rows meant for the sheet, in sheet order, and whether every write
+        succeeded.
+    """
+    valid_products = list(valid_view)
+    logger.info(
+        f"process_listing_sheet: sheet='{sheet.name}' valid_products={len(valid_products)}"
+    )
+    sheet_rows.inc(
+        len(valid_products),
+        spreadsheet=sheet.spreadsheet_id[:8],
+        sheet=sheet.name,
+        outcome="processed",
+    )
+
+    # Step 3–5: Write rows starting at row 4 and clear what is left below them
+    if config.LISTING_SYNC_MODE == "diff":
+        all_ok = await _sync_listing_sheet_diff(sheet, valid_products)
+    else:
+        all_ok = await _sync_listing_sheet_full(sheet, valid_products)
+
     logger.info(
         f"process_listing_sheet: complete — sheet='{sheet.name}' "
-        f"total_valid_products={len(valid_products)}"
+        f"total_valid_products={len(valid_products)} all_writes_ok={all_ok}"
     )
-    return valid_products
+    return valid_view, all_ok
+
+
+async def process_listing_sheet(
+    sheet: SheetEntry,
+    lapakgaming_catalog: ProductCatalog,
+) -> tuple[CatalogView, bool]:
+    """Process a single listing sheet: filter products by keywords and write to sheet.
+
+    Returns:
+        The catalog rows meant for the sheet, in sheet order, and whether every write
+        succeeded.
+    """
+    logger.info(
+        f"process_listing_sheet: starting sheet='{sheet.name}' id={sheet.spreadsheet_id[:8]}…"
+    )
+
+    # Step 1: Read keyword config from rows 2 and 3
+    keyword_mapping = await get_include_exclude_keywords(
+        sheet.spreadsheet_id, sheet.name
+    )
+
+    # Step 2: Filter products
+    valid_view = filter_listing_products(
+        lapakgaming_catalog.view(), keyword_matcher(keyword_mapping)
+    )
+
+    return await write_listing_sheet(sheet, valid_view)
+
 
+@traced("lapak", lambda a: {"country_code": a["country_code"]})
+async def _fetch_products_for_country(
+    country_code: str,
+) -> tuple[ProductCatalog, bool]:
+    """Fetch all products for a single country code.
 
-async def _fetch_products_for_country(country_code: str) -> list[LapakgamingProduct]:
-    """Fetch all products for a single country code. Logs errors and returns empty list on failure."""
+    Returns:
+        The country's products and whether they changed since the previous round.
+        Logs errors and returns an empty (changed) catalog on failure.
+    """
+    started = time.perf_counter()
     try:
-        result = await lapakgaming_api_client.get_all_products(
-            country_code=country_code
-        )
-        products = result.data.products
+        fetched: ProductCatalog | None
+        if config.LAPAK_STREAM_PARSE:
+            fetched, etag = await lapakgaming_api_client.stream_all_products_if_changed(
+                country_code=country_code,
+                etag=catalog_change_tracker.etag(country_code),
+            )
+        else:
+            result, etag = await lapakgaming_api_client.get_all_products_if_changed(
+                country_code=country_code,
+                etag=catalog_change_tracker.etag(country_code),
+            )
+            fetched = (
+                None
+                if result is None
+                else ProductCatalog.from_products(result.data.products)
+            )
+
+        if fetched is None:
+            # 304 Not Modified: an ETag is only sent when the tracker holds that catalog
+            products = catalog_change_tracker.reuse(country_code) or ProductCatalog()
+            changed = False
+        else:
+            products, changed = catalog_change_tracker.record(
+                country_code, fetched, etag
+            )
         logger.info(
-            f"_fetch_products_for_country: country_code={country_code} count={len(products)}"
+            f"_fetch_products_for_country: country_code={country_code} count={len(products)} "
+            f"changed={changed}"
         )
-        return products
+        lapak_fetch_seconds.observe(
+            time.perf_counter() - started,
+            country_code=country_code,
+            outcome="changed" if changed else "unchanged",
+        )
+        catalog_products.set(len(products), country_code=country_code)
+        return products, changed
     except Exception as e:
+        lapak_fetch_seconds.observe(
+            time.perf_counter() - started, country_code=country_code, outcome="error"
+        )
+        catalog_change_tracker.invalidate(country_code)
         logger.error(
             f"_fetch_products_for_country: failed for country_code={country_code}: {e}",
             exc_info=True,
         )
-        return []
+        return ProductCatalog(), True
+
+
+async def _fetch_country(country_code: str) -> tuple[str, ProductCatalog, bool]:
+    products, changed = await _fetch_products_for_country(country_code)
+    return country_code, products, changed
 
 
 async def process():
-    # Step 1: Fetch all lapakgaming products in parallel (one task per country code)
+    global _skipped_rounds, _last_round_complete
+
+    from app import sheets_config
+
+    tracer.start_round()
+    round_started = time.perf_counter()
+    listing_sheets = sheets_config.listing_sheets
+    country_codes = list(COUNTRY_CODES.keys())
+
+    # Step 1: Fetch all lapakgaming products in parallel (one task per country code) and
+    # filter each country through every listing sheet's keywords as soon as it arrives.
+    # The keyword configs are read and compiled while the catalog is still downloading.
     logger.info(
         "process: fetching lapakgaming products for all country codes in parallel"
     )
-    country_codes = list(COUNTRY_CODES.keys())
-    results = await asyncio.gather(
-        *[_fetch_products_for_country(cc) for cc in country_codes],
-        return_exceptions=True,
+    keyword_tasks = [
+        asyncio.create_task(read_keyword_matcher(sheet)) for sheet in listing_sheets
+    ]
+    country_catalogs: dict[str, ProductCatalog] = {}
+    changed_countries: set[str] = set()
+    # Per listing sheet: rows of each country's catalog passing the sheet's filters, or
+    # the error that prevented reading its keywords
+    listing_rows: list[dict[str, CatalogView] | BaseException] = [
+        {} for _ in listing_sheets
+    ]
+    try:
+        for next_country in asyncio.as_completed(
+            [_fetch_country(cc) for cc in country_codes]
+        ):
+            cc, products, changed = await next_country
+            country_catalogs[cc] = products
+            if changed:
+                changed_countries.add(cc)
+
+            for i, keyword_task in enumerate(keyword_tasks):
+                rows_by_country = listing_rows[i]
+                if isinstance(rows_by_country, BaseException):
+                    continue
+                try:
+                    matcher = await keyword_task
+                except Exception as e:
+                    listing_rows[i] = e
+                    continue
+                rows_by_country[cc] = filter_listing_products(products.view(), matcher)
+    except BaseException:
+        for keyword_task in keyword_tasks:
+            keyword_task.cancel()
+        raise
+
+    # One columnar catalog, indexed by product code, shared across all sheets
+    lapakgaming_catalog = ProductCatalog.concat(
+        country_catalogs[cc] for cc in country_codes
+    )
+    tracer.complete("fetch_phase", "round", round_started)
+    logger.info(
+        f"process: total products fetched = {len(lapakgaming_catalog)}, "
+        f"changed countries = {[cc for cc in country_codes if cc in changed_countries]}"
     )
 
-    all_products: list[LapakgamingProduct] = []
-    for cc, result in zip(country_codes, results):
-        if isinstance(result, BaseException):
-            logger.error(
-                f"process: country_code={cc} fetch failed: {result}", exc_info=result
-            )
-        else:
-            all_products.extend(result)
-
-    logger.info(f"process: total products fetched = {len(all_products)}")
+    # Nothing moved in the catalog and the previous round wrote everything: skip the
+    # Sheets work, but still run a full round every MAX_SKIPPED_ROUNDS so that edits made
+    # on the sheets themselves get picked up.
+    if (
+        config.SKIP_UNCHANGED_ROUNDS
+        and not changed_countries
+        and _last_round_complete
+        and _skipped_rounds < config.MAX_SKIPPED_ROUNDS
+    ):
+        _skipped_rounds += 1
+        logger.info(
+            f"process: catalog unchanged, skipping sheets "
+            f"({_skipped_rounds}/{config.MAX_SKIPPED_ROUNDS} consecutive)"
+        )
+        round_seconds.observe(time.perf_counter() - round_started, outcome="skipped")
+        await tracer.finish_round(outcome="skipped")
+        await asyncio.sleep(config.RELAX_AFTER_EACH_ROUND)
+        return
+    _skipped_rounds = 0
+    round_complete = True
 
-    # Convert to dict keyed by product code (shared across all sheets)
-    lapakgaming_product_dict = to_product_dict(all_products)
+    # Step 2: Listing phase — write all listing sheets, collect listing data
+    logger.info(
+        f"process: listing phase — processing {len(listing_sheets)} listing sheet(s)"
+    )
+    # Country views point into their own catalogs; shift them onto the joined catalog
+    offsets: dict[str, int] = {}
+    offset = 0
+    for cc in country_codes:
+        offsets[cc] = offset
+        offset += len(country_catalogs[cc])
+
+    async def write_sheet(
+        sheet: SheetEntry,
+        rows_by_country: dict[str, CatalogView] | BaseException,
+    ) -> tuple[CatalogView, bool]:
+        if isinstance(rows_by_country, BaseException):
+            raise rows_by_country
+        valid_view = lapakgaming_catalog.view(
+            offsets[cc] + row
+            for cc in country_codes
+            for row in rows_by_country[cc].rows
+        )
+        return await write_listing_sheet(sheet, valid_view)
 
-    # Step 2: Listing phase — update all listing sheets, collect listing data
-    from app import sheets_config
+    # Listing sheets run concurrently; in-flight Sheets requests are bounded globally
+    # by SHEETS_MAX_CONCURRENT_REQUESTS inside AsyncSheetsClient.
+    with tracer.span("listing_phase", "round"):
+        listing_results = await asyncio.gather(
+            *[
+                write_sheet(sheet, rows_by_country)
+                for sheet, rows_by_country in zip(listing_sheets, listing_rows)
+            ],
+            return_exceptions=True,
+        )
 
-    logger.info(
-        f"process: listing phase — processing {len(sheets_config.listing_sheets)} listing sheet(s)"
-    )
-    all_listing_products: list[LapakgamingProduct] = []
-    for sheet in sheets_config.listing_sheets:
-        try:
-            listing_products = await process_listing_sheet(sheet, all_products)
-            all_listing_products.extend(listing_products)
-        except Exception as e:
+    listing_views: list[CatalogView] = []
+    for sheet, result in zip(listing_sheets, listing_results):
+        if isinstance(result, BaseException):
+            round_complete = False
             logger.error(
-                f"process: listing sheet='{sheet.name}' failed with unhandled error: {e}",
-                exc_info=True,
+                f"process: listing sheet='{sheet.name}' failed with unhandled error: {result}",
+                exc_info=result,
             )
+        else:
+            valid_view, all_ok = result
+            listing_views.append(valid_view)
+            if not all_ok:
+                round_complete = False
+                logger.warning(
+                    f"process: listing sheet='{sheet.name}' had failed writes, "
+                    f"round marked incomplete"
+                )
 
     logger.info("process: listing phase complete, starting logging phase")
 
     # Step 3: Logging phase — derive codes + process prices for each logging sheet
-    all_listing_codes: list[str | None] = [p.code for p in all_listing_products]
+    all_listing_codes: list[str | None] = [
+        code for view in listing_views for code in view.column("code")
+    ]
     all_listing_country_codes: list[str | None] = [
-        p.country_code for p in all_listing_products
+        country_code
+        for view in listing_views
+        for country_code in view.column("country_code")
     ]
+    # Built once per round and shared by every logging sheet
+    with tracer.span("build_pricing_index", "round"):
+        listing_index = ListingCodeIndex(all_listing_codes, all_listing_country_codes)
+        pricing_index = RoundPricingIndex(lapakgaming_catalog, listing_index)
 
     logger.info(
-        f"process: processing {len(sheets_config.logging_sheets)} logging sheet(s) sequentially, "
+        f"process: processing {len(sheets_config.logging_sheets)} logging sheet(s) concurrently, "
         f"{len(all_listing_codes)} listing codes available"
     )
-    for sheet in sheets_config.logging_sheets:
-        try:
-            await process_sheet(
-                sheet,
-                lapakgaming_product_dict,
-                all_listing_codes,
-                all_listing_country_codes,
-            )
-        except Exception as e:
+    with tracer.span("logging_phase", "round"):
+        logging_results = await asyncio.gather(
+            *[
+                process_sheet(
+                    sheet,
+                    pricing_index,
+                )
+                for sheet in sheets_config.logging_sheets
+            ],
+            return_exceptions=True,
+        )
+    for sheet, result in zip(sheets_config.logging_sheets, logging_results):
+        if isinstance(result, BaseException):
+            round_complete = False
             logger.error(
-                f"process: sheet='{sheet.name}' failed with unhandled error: {e}",
-                exc_info=True,
+                f"process: sheet='{sheet.name}' failed with unhandled error: {result}",
+                exc_info=result,
+            )
+        elif not result:
+            round_complete = False
+            logger.warning(
+                f"process: sheet='{sheet.name}' had failed batches, round marked incomplete"
             )
 
-    logger.info("process: all sheets processed")
+    _last_round_complete = round_complete
+    await row_result_cache.save()
+    logger.info(
+        f"process: all sheets processed "
+        f"({len(pricing_index)} distinct prefix/country groups priced)"
+    )
+    logger.info(f"process: sheets rate limiter levels={sheets_rate_limiter.levels()}")
+    round_seconds.observe(
+        time.perf_counter() - round_started,
+        outcome="complete" if round_complete else "partial",
+    )
+    await tracer.finish_round(outcome="complete" if round_complete else "partial")
     await asyncio.sleep(config.RELAX_AFTER_EACH_ROUND)
@@ -0,0 +1,118 @@
+import asyncio
+import json
+import os
+from pathlib import Path
+
+from pydantic import BaseModel
+
+from app import config, logger
+
+
+class RowResult(BaseModel):
+    """What batch_process computed for one logging row, and what it was computed from."""
+
+    Code_Prefix: str | None
+    country_code_priority: str | None
+    stamp: str  # Derived codes plus the values of every matched product
+    code: str | None
+    LOWEST_PRICE: str | None
+    NOTE: str | None  # Without the leading timestamp
+    LOG_CODE: str | None
+    LOG_COUNTRY: str | None
+
+
+class RowResultCache:
+    """Per-row pricing results kept across rounds (and restarts, when given a path).
+
+    A row is recomputed only when its inputs (Code_Prefix, country_code_priority) or the
+    stamp of its matched products changed; rows that disappear from a sheet are evicted.
+    """
+
+    def __init__(self, path: str | None = None) -> None:
+        self.path = Path(path) if path else None
+        self._rows: dict[tuple[str, str], dict[int, RowResult]] = {}
+        self._loaded = False
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            entries = json.loads(self.path.read_text(encoding="utf-8"))
+            for entry in entries:
+                sheet = (entry.pop("sheet_id"), entry.pop("sheet_name"))
+                index = entry.pop("index")
+                self._rows.setdefault(sheet, {})[index] = RowResult.model_validate(entry)
+        except Exception as e:
+            self._rows = {}
+            logger.warning(
+                f"RowResultCache._ensure_loaded: ignoring unreadable {self.path}: {e}"
+            )
+            return
+        logger.info(f"RowResultCache._ensure_loaded: {len(self)} rows from {self.path}")
+
+    def __len__(self) -> int:
+        return sum(len(rows) for rows in self._rows.values())
+
+    def get(
+        self,
+        sheet_id: str,
+        sheet_name: str,
+        index: int,
+        Code_Prefix: str | None,
+        country_code_priority: str | None,
+        stamp: str,
+    ) -> RowResult | None:
+        self._ensure_loaded()
+        result = self._rows.get((sheet_id, sheet_name), {}).get(index)
+        if (
+            result is None
+            or result.Code_Prefix != Code_Prefix
+            or result.country_code_priority != country_code_priority
+            or result.stamp != stamp
+        ):
+            return None
+        return result
+
+    def put(self, sheet_id: str, sheet_name: str, index: int, result: RowResult) -> None:
+        self._ensure_loaded()
+        self._rows.setdefault((sheet_id, sheet_name), {})[index] = result
+
+    def retain(self, sheet_id: str, sheet_name: str, indexes: list[int]) -> None:
+        """Evict the rows of a sheet that are not in `indexes`."""
+        self._ensure_loaded()
+        rows = self._rows.get((sheet_id, sheet_name))
+        if not rows:
+            return
+        keep = set(indexes)
+        for index in [index for index in rows if index not in keep]:
+            del rows[index]
+
+    def _write(self, path: Path, payload: str) -> None:
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        tmp_path.write_text(payload, encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    async def save(self) -> None:
+        """Persist the cache to `path` (no-op without one)."""
+        if self.path is None or not self._loaded:
+            return
+        entries = [
+            {
+                "sheet_id": sheet_id,
+                "sheet_name": sheet_name,
+                "index": index,
+                **result.model_dump(),
+            }
+            for (sheet_id, sheet_name), rows in self._rows.items()
+            for index, result in rows.items()
+        ]
+        try:
+            await asyncio.to_thread(self._write, self.path, json.dumps(entries))
+        except OSError as e:
+            logger.warning(f"RowResultCache.save: could not write {self.path}: {e}")
+
+
+row_result_cache = RowResultCache(config.ROW_RESULT_CACHE_PATH)
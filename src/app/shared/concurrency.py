@@ -0,0 +1,33 @@
+import asyncio
+from typing import Awaitable, Callable, Sequence, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+async def run_sliding_window(
+    items: Sequence[T],
+    worker: Callable[[T], Awaitable[R]],
+    limit: int,
+) -> list[R | Exception]:
+    """Run `worker` over `items` keeping up to `limit` calls in flight at all times.
+
+    Unlike gathering fixed groups of `limit`, the next item starts as soon as any
+    running call finishes, so one slow call only occupies its own slot.
+
+    Returns:
+        One entry per item, in input order: the worker's result, or the exception it
+        raised (like asyncio.gather(..., return_exceptions=True)).
+    """
+    results: list[R | Exception] = [None] * len(items)  # type: ignore[list-item]
+    pending = iter(enumerate(items))  # shared by all lanes; safe on a single event loop
+
+    async def lane() -> None:
+        for i, item in pending:
+            try:
+                results[i] = await worker(item)
+            except Exception as e:
+                results[i] = e
+
+    await asyncio.gather(*[lane() for _ in range(min(max(limit, 1), len(items)))])
+    return results
@@ -0,0 +1,271 @@
+import asyncio
+import bisect
+import logging
+import time
+from contextlib import contextmanager
+from typing import Final, Iterator, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Seconds; covers a fast Sheets read up to a slow full-catalog download
+DEFAULT_BUCKETS: Final[tuple[float, ...]] = (
+    0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300,
+)
+ROUND_BUCKETS: Final[tuple[float, ...]] = (
+    5, 15, 30, 60, 120, 180, 300, 600, 900, 1800,
+)
+CONTENT_TYPE: Final[str] = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+    return f"{{{pairs}}}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class Metric:
+    """A named metric family; one value (or histogram) per combination of label values."""
+
+    type_name: str = ""
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: dict[str, object]) -> tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"Metric {self.name}: expected labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+            *self.samples(),
+        ]
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    type_name = "counter"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: object) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: object) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> Iterator[str]:
+        for key, value in sorted(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    type_name = "gauge"
+
+    def set(self, value: float, **labels: object) -> None:
+        self._values[self._key(labels)] = value
+
+
+class Histogram(Metric):
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> (per-bucket counts incl. +Inf, sum)
+        self._values: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: object) -> None:
+        key = self._key(labels)
+        entry = self._values.get(key)
+        if entry is None:
+            entry = self._values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+        counts, total = entry
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        total[0] += value
+
+    @contextmanager
+    def time(self, **labels: object) -> Iterator[None]:
+        """Observe the wall time of the `with` block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels: object) -> int:
+        entry = self._values.get(self._key(labels))
+        return sum(entry[0]) if entry else 0
+
+    def samples(self) -> Iterator[str]:
+        bounds = [*self.buckets, float("inf")]
+        for key, (counts, total) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                labels = _format_labels(
+                    (*self.labelnames, "le"), (*key, _format_value(bound))
+                )
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(total[0])}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class MetricsRegistry:
+    """The worker's metrics, rendered in the Prometheus text exposition format."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, Metric] = {}
+
+    def _register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"MetricsRegistry: duplicate metric {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))  # type: ignore[return-value]
+
+    def gauge(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))  # type: ignore[return-value]
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(  # type: ignore[return-value]
+            Histogram(name, documentation, labelnames, buckets)
+        )
+
+    def render(self) -> str:
+        return "\n".join(m.render() for m in self._metrics.values()) + "\n"
+
+
+async def _handle_scrape(
+    registry: MetricsRegistry,
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+) -> None:
+    try:
+        request_line = await reader.readline()
+        while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+            pass  # Headers are not needed
+        parts = request_line.decode("latin-1").split()
+        if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] == "/metrics":
+            status, body, content_type = "200 OK", registry.render().encode(), CONTENT_TYPE
+        else:
+            status, body, content_type = "404 Not Found", b"Not Found\n", "text/plain"
+        writer.write(
+            f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+            + body
+        )
+        await writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError) as e:
+        logger.debug(f"metrics: scrape connection dropped: {e}")
+    finally:
+        writer.close()
+
+
+async def start_metrics_server(
+    host: str, port: int, registry: "MetricsRegistry | None" = None
+) -> asyncio.Server:
+    """Serve `GET /metrics` on host:port from the running event loop."""
+    registry = registry or metrics_registry
+    server = await asyncio.start_server(
+        lambda reader, writer: _handle_scrape(registry, reader, writer), host, port
+    )
+    logger.info(f"metrics: serving Prometheus metrics on http://{host}:{port}/metrics")
+    return server
+
+
+metrics_registry = MetricsRegistry()
+
+# Sheets
+sheets_request_seconds = metrics_registry.histogram(
+    "lpk_sheets_request_seconds",
+    "Latency of single Google Sheets HTTP calls",
+    ["operation", "status"],
+)
+sheets_operation_seconds = metrics_registry.histogram(
+    "lpk_sheets_operation_seconds",
+    "Google Sheets operations end to end, including key rotation and rate-limit waits",
+    ["operation"],
+)
+sheets_key_errors = metrics_registry.counter(
+    "lpk_sheets_key_errors_total",
+    "HTTP 429 and 403 responses per service-account key",
+    ["key", "status"],
+)
+token_refreshes = metrics_registry.counter(
+    "lpk_token_refreshes_total",
+    "OAuth2 access tokens fetched per service-account key",
+    ["key"],
+)
+
+# Lapakgaming
+lapak_fetch_seconds = metrics_registry.histogram(
+    "lpk_lapak_fetch_seconds",
+    "Lapakgaming product list fetches per country",
+    ["country_code", "outcome"],
+)
+catalog_products = metrics_registry.gauge(
+    "lpk_catalog_products",
+    "Products in the latest Lapakgaming catalog per country",
+    ["country_code"],
+)
+
+# Rounds and sheets
+sheet_rows = metrics_registry.counter(
+    "lpk_sheet_rows_total",
+    "Rows processed, written and skipped (unchanged) per sheet (spreadsheet id prefix "
+    "and tab name)",
+    ["spreadsheet", "sheet", "outcome"],
+)
+round_seconds = metrics_registry.histogram(
+    "lpk_round_seconds",
+    "Duration of process() rounds, excluding the pause after them",
+    ["outcome"],
+    buckets=ROUND_BUCKETS,
+)
@@ -13,11 +13,14 @@ All three:
   - Set reraise=True so the original exception propagates after retries
     are exhausted (not tenacity.RetryError).
   - Log a WARNING before each sleep via before_sleep_log (FR26).
+  - Record each back-off sleep as a span of the round trace (see tracing.py).
 
 Decorator application to async def methods is handled in Story 3.2.
 """
 
+import asyncio
 import logging
+from typing import Awaitable, Callable
 
 import httpx
 from tenacity import (
@@ -29,6 +32,8 @@ from tenacity import (
     wait_fixed,
 )
 
+from .tracing import tracer
+
 logger = logging.getLogger(__name__)
 
 
@@ -77,11 +82,22 @@ def _is_retryable_lapak_error(exc: BaseException) -> bool:
     return False
 
 
+def _traced_sleep(policy: str) -> Callable[[float], Awaitable[None]]:
+    """Back-off sleep that shows up in round traces as a `retry.backoff` span."""
+
+    async def sleep(seconds: float) -> None:
+        with tracer.span("retry.backoff", "rate_limit", policy=policy, wait=seconds):
+            await asyncio.sleep(seconds)
+
+    return sleep
+
+
 # ---------------------------------------------------------------------------
 # Named retry-policy decorators
 # ---------------------------------------------------------------------------
 
 SHEETS_READ_RETRY = retry(
+    sleep=_traced_sleep("SHEETS_READ_RETRY"),
     stop=stop_after_attempt(5),
     wait=wait_exponential(min=2, max=15),
     retry=retry_if_exception(_is_retryable_sheets_error),
@@ -90,6 +106,7 @@ SHEETS_READ_RETRY = retry(
 )
 
 SHEETS_WRITE_RETRY = retry(
+    sleep=_traced_sleep("SHEETS_WRITE_RETRY"),
     stop=stop_after_attempt(5),
     wait=wait_exponential(min=2, max=40),
     retry=retry_if_exception(_is_retryable_sheets_error),
@@ -98,6 +115,7 @@ SHEETS_WRITE_RETRY = retry(
 )
 
 LAPAK_API_RETRY = retry(
+    sleep=_traced_sleep("LAPAK_API_RETRY"),
     stop=stop_after_attempt(3),
     wait=wait_fixed(0.5),
     retry=retry_if_exception(_is_retryable_lapak_error),
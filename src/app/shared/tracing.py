@@ -0,0 +1,219 @@
+import asyncio
+import functools
+import inspect
+import itertools
+import json
+import os
+import time
+import weakref
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Final, TypeVar
+
+from app import config, logger
+
+R = TypeVar("R")
+
+TRACE_FILE_PREFIX: Final[str] = "round-"
+
+
+class _NullSpan:
+    """Stand-in returned by `Tracer.span` when nothing is being recorded."""
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+    def set(self, **args: Any) -> None:
+        pass
+
+
+_NULL_SPAN: Final[_NullSpan] = _NullSpan()
+
+
+class _Span:
+    def __init__(
+        self, tracer: "Tracer", name: str, category: str, args: dict[str, Any]
+    ) -> None:
+        self._tracer = tracer
+        self._name = name
+        self._category = category
+        self._args = args
+        self._started = 0.0
+
+    def __enter__(self) -> "_Span":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None:
+            self._args["error"] = exc_type.__name__
+        self._tracer.complete(self._name, self._category, self._started, **self._args)
+
+    def set(self, **args: Any) -> None:
+        """Attach args known only once the span is under way (e.g. a response status)."""
+        self._args.update(args)
+
+
+class Tracer:
+    """Records spans of one `process()` round and writes them as a Chrome trace file.
+
+    Every asyncio task gets its own track (trace-event `tid`), so concurrent sheets,
+    batches and requests show up side by side and the spans of each track nest. The
+    file opens in chrome://tracing or https://ui.perfetto.dev.
+
+    Outside a round, or without a trace directory, spans cost one attribute check.
+    """
+
+    def __init__(self, trace_dir: str | None, keep_rounds: int) -> None:
+        self.trace_dir = Path(trace_dir) if trace_dir else None
+        self.keep_rounds = keep_rounds
+        self._events: list[dict[str, Any]] | None = None
+        self._origin = 0.0
+        self._started_at: datetime | None = None
+        self._round = 0
+        self._next_tid = itertools.count(1)
+        # Task -> (tid, its thread_name metadata event)
+        self._tids: weakref.WeakKeyDictionary[
+            asyncio.Task, tuple[int, dict[str, Any]]
+        ] = weakref.WeakKeyDictionary()
+
+    @property
+    def active(self) -> bool:
+        return self._events is not None
+
+    def start_round(self) -> None:
+        """Start recording a round; spans of an unfinished previous round are dropped."""
+        if self.trace_dir is None:
+            return
+        self._round += 1
+        self._events = []
+        self._next_tid = itertools.count(1)
+        self._tids = weakref.WeakKeyDictionary()
+        self._origin = time.perf_counter()
+        self._started_at = datetime.now()
+
+    def _tid(self, name: str) -> int:
+        """Track of the current task, named after its last finished (outermost) span."""
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:  # No running event loop
+            task = None
+        if task is None:
+            return 0
+        track = self._tids.get(task)
+        if track is None:
+            track = self._tids[task] = (
+                next(self._next_tid),
+                {"name": "thread_name", "ph": "M", "pid": 1, "args": {}},
+            )
+            track[1]["tid"] = track[0]
+            self._events.append(track[1])  # type: ignore[union-attr]
+        tid, thread_name = track
+        thread_name["args"]["name"] = f"{name} ({task.get_name()})"
+        return tid
+
+    def complete(
+        self,
+        name: str,
+        category: str,
+        started: float,
+        ended: float | None = None,
+        **args: Any,
+    ) -> None:
+        """Record a span from `started` to `ended` (time.perf_counter(), default now)."""
+        if self._events is None or started < self._origin:
+            return  # Not tracing, or a span left over from an earlier round
+        ended = time.perf_counter() if ended is None else ended
+        self._events.append(
+            {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": round((started - self._origin) * 1e6, 1),
+                "dur": round((ended - started) * 1e6, 1),
+                "pid": 1,
+                "tid": self._tid(name),
+                "args": args,
+            }
+        )
+
+    def span(self, name: str, category: str, **args: Any) -> "_Span | _NullSpan":
+        """Context manager recording the wall time of its block as a span."""
+        if self._events is None:
+            return _NULL_SPAN
+        return _Span(self, name, category, args)
+
+    async def finish_round(self, **args: Any) -> None:
+        """Record the round itself as a `process` span and write the trace file."""
+        if self._events is None or self.trace_dir is None:
+            return
+        self.complete("process", "round", self._origin, round=self._round, **args)
+        events, self._events = self._events, None
+        started_at = self._started_at or datetime.now()
+        path = self.trace_dir / (
+            f"{TRACE_FILE_PREFIX}{started_at:%Y%m%d-%H%M%S}-{self._round:05d}.json"
+        )
+        trace = {
+            "traceEvents": [
+                {
+                    "name": "process_name",
+                    "ph": "M",
+                    "pid": 1,
+                    "args": {"name": f"lpk_price_log round {self._round}"},
+                },
+                *events,
+            ],
+            "displayTimeUnit": "ms",
+            "otherData": {"started_at": started_at.isoformat(timespec="seconds")},
+        }
+        try:
+            await asyncio.to_thread(self._write, path, json.dumps(trace))
+        except OSError as e:
+            logger.warning(f"Tracer.finish_round: could not write {path}: {e}")
+            return
+        logger.info(f"Tracer.finish_round: wrote {len(events)} span(s) to {path}")
+
+    def _write(self, path: Path, data: str) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(data, encoding="utf-8")
+        os.replace(tmp_path, path)
+        if self.keep_rounds > 0:
+            old = sorted(path.parent.glob(f"{TRACE_FILE_PREFIX}*.json"))
+            for stale in old[: -self.keep_rounds]:
+                stale.unlink(missing_ok=True)
+
+
+def traced(
+    category: str,
+    describe: Callable[[dict[str, Any]], dict[str, Any]] | None = None,
+) -> Callable[[Callable[..., Awaitable[R]]], Callable[..., Awaitable[R]]]:
+    """Record every call of the decorated coroutine function as a span.
+
+    `describe` maps the call's arguments, by parameter name, to the span's args.
+    """
+
+    def decorator(func: Callable[..., Awaitable[R]]) -> Callable[..., Awaitable[R]]:
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> R:
+            if not tracer.active:
+                return await func(*args, **kwargs)
+            span_args = {}
+            if describe is not None:
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                span_args = describe(bound.arguments)
+            with tracer.span(func.__name__, category, **span_args):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+tracer = Tracer(config.TRACE_DIR, config.TRACE_KEEP_ROUNDS)
@@ -3,6 +3,7 @@ import logging
 from .. import config
 from .key_rotation import KeyRotationPool
 from .auth import TokenCache
+from .rate_limiter import KeyRateLimiter
 from .g_sheet import async_sheets_client  # New in Story 2.2
 
 ## Seting logger
@@ -12,6 +13,18 @@ logger = logging.getLogger(name=__name__)
 key_rotation_pool = KeyRotationPool(config.KEYS_FOLDER_PATH)
 
 # New in Story 2.1 — TokenCache singleton for OAuth2 Bearer tokens
-token_cache = TokenCache()
+token_cache = TokenCache(token_url=config.GOOGLE_TOKEN_URL)
 
-__all__ = ["key_rotation_pool", "token_cache", "async_sheets_client"]  # Updated in Story 2.2
+# Client-side per-key pacing of read/write requests, ahead of Google's 429s
+sheets_rate_limiter = KeyRateLimiter(
+    read_per_minute=config.SHEETS_READ_REQUESTS_PER_MINUTE,
+    write_per_minute=config.SHEETS_WRITE_REQUESTS_PER_MINUTE,
+    burst=config.SHEETS_RATE_LIMIT_BURST,
+)
+
+__all__ = [
+    "key_rotation_pool",
+    "token_cache",
+    "sheets_rate_limiter",
+    "async_sheets_client",
+]
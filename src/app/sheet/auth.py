@@ -6,6 +6,8 @@ from typing import Final
 import httpx
 import jwt  # PyJWT
 
+from ..shared.metrics import token_refreshes
+
 logger = logging.getLogger(__name__)
 
 SCOPES: Final[str] = "https://www.googleapis.com/auth/spreadsheets"
@@ -13,52 +15,124 @@ TOKEN_URL: Final[str] = "https://oauth2.googleapis.com/token"
 GRANT_TYPE: Final[str] = "urn:ietf:params:oauth:grant-type:jwt-bearer"
 TOKEN_LIFETIME: Final[int] = 3600   # seconds; Google's standard token TTL
 REFRESH_BUFFER: Final[int] = 60     # refresh when < 60 s remain
+PRE_REFRESH_BUFFER: Final[int] = 300  # background refresh when < 5 min remain
+MIN_REFRESH_INTERVAL: Final[int] = 30  # floor between background refresh passes (also retry delay)
 
 
 class TokenCache:
-    def __init__(self) -> None:
+    def __init__(self, token_url: str = TOKEN_URL) -> None:
+        self.token_url = token_url
         self._cache: dict[str, dict] = {}          # filename → {"token": str, "expires_at": float}
         self._locks: dict[str, asyncio.Lock] = {}  # filename → asyncio.Lock
+        self._client = httpx.AsyncClient(timeout=30.0)  # pooled connection to the token endpoint
+        self._refresh_task: asyncio.Task | None = None
+
+    def _is_fresh(self, filename: str, buffer: int) -> bool:
+        entry = self._cache.get(filename)
+        return bool(entry) and time.time() < entry["expires_at"] - buffer  # type: ignore[index]
 
     async def get_token(self, filename: str, key_data: dict) -> str:
         # Fast path — valid cached token
-        entry = self._cache.get(filename)
-        if entry and time.time() < entry["expires_at"] - REFRESH_BUFFER:
-            return entry["token"]
+        if self._is_fresh(filename, REFRESH_BUFFER):
+            return self._cache[filename]["token"]
 
-        # Slow path — acquire per-key lock, then double-check
+        # Slow path — refresh inline (normally the background task got there first)
+        return await self._refresh(filename, key_data, REFRESH_BUFFER)
+
+    async def _refresh(self, filename: str, key_data: dict, buffer: int) -> str:
+        """Fetch a new token unless the cached one still has more than `buffer` seconds left."""
+        # Acquire per-key lock, then double-check
         lock = self._locks.setdefault(filename, asyncio.Lock())
         async with lock:
-            entry = self._cache.get(filename)  # re-check after acquiring lock
-            if entry and time.time() < entry["expires_at"] - REFRESH_BUFFER:
-                return entry["token"]  # another coroutine already refreshed
+            if self._is_fresh(filename, buffer):
+                return self._cache[filename]["token"]  # another coroutine already refreshed
 
             token, expires_at = await self._fetch_token(filename, key_data)
             self._cache[filename] = {"token": token, "expires_at": expires_at}
             return token
 
+    async def warm_up(self, keys: list[tuple[str, dict]]) -> None:
+        """Fetch tokens for every key concurrently, so the first requests don't pay for it."""
+        results = await asyncio.gather(
+            *[self._refresh(filename, key_data, REFRESH_BUFFER) for filename, key_data in keys],
+            return_exceptions=True,
+        )
+        for (filename, _), result in zip(keys, results):
+            if isinstance(result, BaseException):
+                logger.error(
+                    f"TokenCache: warm-up failed for key: {filename}: {result}",
+                    exc_info=result,
+                )
+        logger.info(f"TokenCache: warmed up {len(keys)} key(s)")
+
+    def start_background_refresh(self, keys: list[tuple[str, dict]]) -> None:
+        """Start a task that refreshes tokens PRE_REFRESH_BUFFER seconds ahead of expiry."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_loop(keys))
+
+    async def stop_background_refresh(self) -> None:
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+
+    async def _refresh_loop(self, keys: list[tuple[str, dict]]) -> None:
+        while True:
+            now = time.time()
+            # A key without a cached token (e.g. its warm-up failed) is due right away,
+            # so it is retried every MIN_REFRESH_INTERVAL until a fetch succeeds
+            next_due = min(
+                (
+                    self._cache[filename]["expires_at"] - PRE_REFRESH_BUFFER
+                    if filename in self._cache
+                    else now
+                    for filename, _ in keys
+                ),
+                default=now,
+            )
+            await asyncio.sleep(max(next_due - now, MIN_REFRESH_INTERVAL))
+
+            results = await asyncio.gather(
+                *[
+                    self._refresh(filename, key_data, PRE_REFRESH_BUFFER)
+                    for filename, key_data in keys
+                ],
+                return_exceptions=True,
+            )
+            for (filename, _), result in zip(keys, results):
+                if isinstance(result, BaseException):
+                    logger.warning(
+                        f"TokenCache: background refresh failed for key: {filename}: {result}"
+                    )
+
     async def _fetch_token(self, filename: str, key_data: dict) -> tuple[str, float]:
         now = int(time.time())
         payload = {
             "iss": key_data["client_email"],
             "scope": SCOPES,
-            "aud": TOKEN_URL,
+            "aud": self.token_url,
             "iat": now,
             "exp": now + TOKEN_LIFETIME,
         }
-        assertion = jwt.encode(payload, key_data["private_key"], algorithm="RS256")
+        # RS256 signing is CPU-bound — keep it off the event loop
+        assertion = await asyncio.to_thread(
+            jwt.encode, payload, key_data["private_key"], algorithm="RS256"
+        )
 
-        async with httpx.AsyncClient() as client:
-            resp = await client.post(
-                TOKEN_URL,
-                data={"grant_type": GRANT_TYPE, "assertion": assertion},
-            )
-            resp.raise_for_status()
-            data = resp.json()
+        resp = await self._client.post(
+            self.token_url,
+            data={"grant_type": GRANT_TYPE, "assertion": assertion},
+        )
+        resp.raise_for_status()
+        data = resp.json()
 
         access_token: str = data["access_token"]
         expires_in: int = data.get("expires_in", TOKEN_LIFETIME)
         expires_at = time.time() + expires_in
+        token_refreshes.inc(key=filename)
 
         logger.debug(f"TokenCache: fetched new token for key: {filename}")  # filename ONLY — never token content
         return access_token, expires_at
@@ -3,3 +3,8 @@ from enum import Enum
 
 class CheckType(Enum):
     RUN = "1"
+
+
+class QuotaKind(Enum):
+    READ = "read"
+    WRITE = "write"
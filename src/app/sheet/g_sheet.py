@@ -1,20 +1,62 @@
 import asyncio
 import logging
+import time
 from typing import Any, Final
 
 import httpx
 
+from .enums import QuotaKind
+from .request_builder import SheetsRequestBuilder, split_payloads
+from .write_coalescer import WriteCoalescer
+from ..shared.metrics import (
+    sheets_key_errors,
+    sheets_operation_seconds,
+    sheets_request_seconds,
+)
 from ..shared.retry_policies import SHEETS_READ_RETRY, SHEETS_WRITE_RETRY
+from ..shared.tracing import tracer
 
 logger = logging.getLogger(__name__)
 
-# P2: Final[str] annotation per project constant convention
-SHEETS_BASE_URL: Final[str] = "https://sheets.googleapis.com/v4/spreadsheets"
+# Token-bucket waits shorter than this are left out of round traces
+MIN_TRACED_WAIT_SECONDS: Final[float] = 0.001
 
 
 class AsyncSheetsClient:
-    def __init__(self) -> None:
+    def __init__(self, base_url: str | None = None) -> None:
+        if base_url is None:
+            from .. import config  # Lazy import to avoid circular
+
+            base_url = config.SHEETS_BASE_URL
+        self.base_url = base_url.rstrip("/")
         self._client = httpx.AsyncClient(timeout=None)
+        self._request_slots: asyncio.Semaphore | None = None
+        self._write_coalescer: WriteCoalescer | None = None
+        # spreadsheet_id -> {sheet title: sheetId}
+        self._sheet_ids: dict[str, dict[str, int]] = {}
+
+    def _get_request_slots(self) -> asyncio.Semaphore:
+        """Global budget of in-flight requests, shared by every sheet using this client."""
+        if self._request_slots is None:
+            from .. import config  # Lazy import to avoid circular
+
+            self._request_slots = asyncio.Semaphore(
+                config.SHEETS_MAX_CONCURRENT_REQUESTS
+            )
+        return self._request_slots
+
+    def _get_write_coalescer(self) -> WriteCoalescer | None:
+        """Opt-in (SHEETS_WRITE_COALESCE) merger of concurrent batch_update calls."""
+        from .. import config  # Lazy import to avoid circular
+
+        if not config.SHEETS_WRITE_COALESCE:
+            return None
+        if self._write_coalescer is None:
+            self._write_coalescer = WriteCoalescer(
+                send=self._send_batch_update,
+                max_ranges=config.SHEETS_WRITE_COALESCE_MAX_RANGES,
+            )
+        return self._write_coalescer
 
     def _handle_response(self, resp: httpx.Response, key_filename: str) -> None:
         if resp.status_code == 403:
@@ -31,65 +73,159 @@ class AsyncSheetsClient:
     async def _execute_with_key_rotation(
         self,
         make_request,  # async callable(headers: dict) -> httpx.Response
+        kind: QuotaKind,
+        operation: str,  # Metrics label, e.g. "batch_get"
     ) -> tuple[str, httpx.Response]:
         """
-        Execute `make_request` with automatic key rotation on HTTP 429.
+        Execute `make_request` with health-aware key selection and rotation on HTTP 429/403.
 
         Rotation strategy:
-        - On each call, fetch the next key from the pool.
-        - If a key returns 429, log the event and immediately try the next key.
-        - Once every key in the pool has been tried (detected by seeing a key we
-          already tried this cycle), log the all-keys-exhausted event, sleep
-          RATE_LIMIT_WAIT_SECONDS, then restart the tried-set and continue.
-        - Non-429 errors fall through: `_handle_response` raises them for the
+        - On each attempt, ask the pool for the least-loaded healthy key (most remaining
+          `kind` quota, fewest in-flight requests, fewest recent 429s), then wait for
+          that key's token bucket so requests are paced under quota before being sent.
+        - If a key returns 429, it cools down for RATE_LIMIT_WAIT_SECONDS and the next
+          healthy key is tried immediately. Only when every key is cooling down does
+          the request sleep, and only until the first key becomes available again.
+        - If a key returns 403, the request moves on to another key. When another key
+          then succeeds, the 403 was the key's fault and it cools down for
+          KEY_FORBIDDEN_COOLDOWN_SECONDS. When every key returns 403 the spreadsheet
+          itself is not shared with the pool: PermissionError is raised and no key
+          is penalised.
+        - Each HTTP call holds one of the SHEETS_MAX_CONCURRENT_REQUESTS slots; the
+          rate-limit wait does not.
+        - Other errors fall through: `_handle_response` raises them for the
           tenacity decorators (SHEETS_READ_RETRY / SHEETS_WRITE_RETRY) to handle.
         """
-        from . import key_rotation_pool, token_cache  # Lazy import to avoid circular
+        from . import (  # Lazy import to avoid circular
+            key_rotation_pool,
+            sheets_rate_limiter,
+            token_cache,
+        )
         from .. import config
 
-        tried: set[str] = set()
+        forbidden: set[str] = set()
         pool_size = key_rotation_pool.pool_size
+        started = time.perf_counter()
 
         while True:
-            filename, key_data = key_rotation_pool.get_next_key()
-            token = await token_cache.get_token(filename, key_data)
-            headers = {"Authorization": f"Bearer {token}"}
-
-            if filename in tried:
-                # Full cycle exhausted — all keys returned 429
-                wait_secs = config.RATE_LIMIT_WAIT_SECONDS
-                if pool_size == 1:
-                    logger.warning(
-                        f"AsyncSheetsClient: only 1 key available, key {filename} hit 429 — "
-                        f"waiting {wait_secs}s before retry"
+            quota_levels = {
+                name: sheets_rate_limiter.level(name, kind)
+                for name, _ in key_rotation_pool.keys
+            }
+            selected = key_rotation_pool.select_key(
+                exclude=forbidden, quota_levels=quota_levels
+            )
+            if selected is None:
+                wait_secs = key_rotation_pool.seconds_until_available(exclude=forbidden)
+                if wait_secs is None:
+                    # Remaining keys are only sidelined after 403s elsewhere — try them
+                    # anyway, waiting out their 429 cool-downs if need be
+                    selected = key_rotation_pool.select_key(
+                        exclude=forbidden, quota_levels=quota_levels, allow_forbidden=True
                     )
-                else:
+                    if selected is None:
+                        wait_secs = key_rotation_pool.seconds_until_available(
+                            exclude=forbidden, allow_forbidden=True
+                        )
+                        if wait_secs is None:
+                            raise PermissionError(
+                                f"Google Sheets 403 for all {len(forbidden)} key(s)"
+                            )
+                if selected is None:
+                    # Every usable key is cooling down after a 429
                     logger.warning(
-                        f"AsyncSheetsClient: all {len(tried)} key(s) hit 429 — "
-                        f"waiting {wait_secs}s before restarting key cycle"
+                        f"AsyncSheetsClient: all {pool_size - len(forbidden)} usable key(s) are "
+                        f"cooling down — waiting {wait_secs:.1f}s for the next available key"
                     )
-                await asyncio.sleep(wait_secs)
-                tried.clear()
+                    with tracer.span("rate_limit.cooldown", "rate_limit"):
+                        await asyncio.sleep(wait_secs)
+                    continue
 
-            tried.add(filename)
+            filename, key_data = selected
             logger.info(f"AsyncSheetsClient: using key {filename}")
 
-            resp = await make_request(headers)
+            key_rotation_pool.mark_in_flight(filename)
+            try:
+                token = await token_cache.get_token(filename, key_data)
+                headers = {"Authorization": f"Bearer {token}"}
+
+                pacing_started = time.perf_counter()
+                await sheets_rate_limiter.acquire(filename, kind)
+                if time.perf_counter() - pacing_started >= MIN_TRACED_WAIT_SECONDS:
+                    tracer.complete(
+                        "rate_limit.pace", "rate_limit", pacing_started, key=filename
+                    )
+                async with self._get_request_slots():
+                    request_started = time.perf_counter()
+                    resp = await make_request(headers)
+                    sheets_request_seconds.observe(
+                        time.perf_counter() - request_started,
+                        operation=operation,
+                        status=resp.status_code,
+                    )
+                    tracer.complete(
+                        f"sheets.http.{operation}",
+                        "sheets",
+                        request_started,
+                        key=filename,
+                        status=resp.status_code,
+                    )
+            finally:
+                key_rotation_pool.mark_done(filename)
+
+            if resp.status_code in (429, 403):
+                sheets_key_errors.inc(key=filename, status=resp.status_code)
 
             if resp.status_code == 429:
+                key_rotation_pool.report_rate_limited(
+                    filename, config.RATE_LIMIT_WAIT_SECONDS
+                )
                 logger.warning(
-                    f"AsyncSheetsClient: 429 rate-limit on key {filename} — rotating to next key "
-                    f"({len(tried)}/{pool_size} keys tried this cycle)"
+                    f"AsyncSheetsClient: 429 rate-limit on key {filename} — cooling it down "
+                    f"for {config.RATE_LIMIT_WAIT_SECONDS}s and rotating to next key"
                 )
                 continue
 
+            if resp.status_code == 403:
+                forbidden.add(filename)
+                if len(forbidden) < pool_size:
+                    logger.error(
+                        f"AsyncSheetsClient: HTTP 403 for key: {filename} — permission denied, "
+                        f"rotating to next key"
+                    )
+                    continue
+
             # Non-429: delegate error handling (raises on 403/5xx/etc.)
             self._handle_response(resp, filename)
+            key_rotation_pool.report_success(filename)
+            for forbidden_filename in forbidden:
+                logger.warning(
+                    f"AsyncSheetsClient: key {forbidden_filename} returned 403 where key "
+                    f"{filename} succeeded — skipping it for "
+                    f"{config.KEY_FORBIDDEN_COOLDOWN_SECONDS}s"
+                )
+                key_rotation_pool.report_forbidden(
+                    forbidden_filename, config.KEY_FORBIDDEN_COOLDOWN_SECONDS
+                )
             logger.debug(f"AsyncSheetsClient: request succeeded with key {filename}")
+            sheets_operation_seconds.observe(
+                time.perf_counter() - started, operation=operation
+            )
+            tracer.complete(f"sheets.{operation}", "sheets", started)
             return filename, resp
 
     @SHEETS_READ_RETRY
-    async def batch_get(self, spreadsheet_id: str, ranges: list[str]) -> dict:
+    async def batch_get(
+        self,
+        spreadsheet_id: str,
+        ranges: list[str],
+        value_render_option: str = "FORMATTED_VALUE",
+    ) -> dict:
+        """Read value ranges.
+
+        With UNFORMATTED_VALUE, numbers come back as stored (12345 rather than a
+        formatted "Rp12.345"), while date-time cells are still rendered as text.
+        """
         # P5: skip API call on empty ranges
         if not ranges:
             return {}
@@ -97,33 +233,52 @@ class AsyncSheetsClient:
 
         async def make_request(headers: dict) -> httpx.Response:
             return await self._client.get(
-                f"{SHEETS_BASE_URL}/{spreadsheet_id}/values:batchGet",
+                f"{self.base_url}/{spreadsheet_id}/values:batchGet",
                 headers=headers,
-                params={"ranges": ranges, "valueRenderOption": "FORMATTED_VALUE"},
+                params={
+                    "ranges": ranges,
+                    "valueRenderOption": value_render_option,
+                    "dateTimeRenderOption": "FORMATTED_STRING",
+                },
             )
 
-        _, resp = await self._execute_with_key_rotation(make_request)
+        _, resp = await self._execute_with_key_rotation(
+            make_request, QuotaKind.READ, "batch_get"
+        )
         return resp.json()
 
-    @SHEETS_WRITE_RETRY
     async def batch_update(
         self, spreadsheet_id: str, data: list[dict[str, Any]]
     ) -> None:
+        """Write value ranges; with SHEETS_WRITE_COALESCE on, merged with concurrent calls."""
         # P5: skip API call on empty data
         if not data:
             return
+
+        write_coalescer = self._get_write_coalescer()
+        if write_coalescer is not None:
+            await write_coalescer.submit(spreadsheet_id, data)
+        else:
+            await self._send_batch_update(spreadsheet_id, data)
+
+    @SHEETS_WRITE_RETRY
+    async def _send_batch_update(
+        self, spreadsheet_id: str, data: list[dict[str, Any]]
+    ) -> None:
         logger.info(
             f"AsyncSheetsClient.batch_update: spreadsheet={spreadsheet_id[:8]}…"
         )
 
         async def make_request(headers: dict) -> httpx.Response:
             return await self._client.post(
-                f"{SHEETS_BASE_URL}/{spreadsheet_id}/values:batchUpdate",
+                f"{self.base_url}/{spreadsheet_id}/values:batchUpdate",
                 headers=headers,
                 json={"valueInputOption": "USER_ENTERED", "data": data},
             )
 
-        await self._execute_with_key_rotation(make_request)
+        await self._execute_with_key_rotation(
+            make_request, QuotaKind.WRITE, "batch_update"
+        )
 
     @SHEETS_READ_RETRY
     async def get_cell_value(
@@ -138,12 +293,14 @@ class AsyncSheetsClient:
 
         async def make_request(headers: dict) -> httpx.Response:
             return await self._client.get(
-                f"{SHEETS_BASE_URL}/{spreadsheet_id}/values/{range_notation}",
+                f"{self.base_url}/{spreadsheet_id}/values/{range_notation}",
                 headers=headers,
                 params={"valueRenderOption": "UNFORMATTED_VALUE"},
             )
 
-        _, resp = await self._execute_with_key_rotation(make_request)
+        _, resp = await self._execute_with_key_rotation(
+            make_request, QuotaKind.READ, "get_cell_value"
+        )
         data = resp.json()
         values = data.get("values")
         if values and values[0]:
@@ -171,7 +328,7 @@ class AsyncSheetsClient:
 
         async def make_request(headers: dict) -> httpx.Response:
             return await self._client.get(
-                f"{SHEETS_BASE_URL}/{spreadsheet_id}/values/{range_notation}",
+                f"{self.base_url}/{spreadsheet_id}/values/{range_notation}",
                 headers=headers,
                 params={
                     "valueRenderOption": "FORMATTED_VALUE",
@@ -179,7 +336,9 @@ class AsyncSheetsClient:
                 },
             )
 
-        _, resp = await self._execute_with_key_rotation(make_request)
+        _, resp = await self._execute_with_key_rotation(
+            make_request, QuotaKind.READ, "get_column_values"
+        )
         data = resp.json()
         values = data.get("values", [])
         return values[0] if values else []
@@ -197,12 +356,14 @@ class AsyncSheetsClient:
 
         async def make_request(headers: dict) -> httpx.Response:
             return await self._client.post(
-                f"{SHEETS_BASE_URL}/{spreadsheet_id}/values:batchClear",
+                f"{self.base_url}/{spreadsheet_id}/values:batchClear",
                 headers=headers,
                 json={"ranges": ranges},
             )
 
-        await self._execute_with_key_rotation(make_request)
+        await self._execute_with_key_rotation(
+            make_request, QuotaKind.WRITE, "batch_clear"
+        )
 
     @SHEETS_WRITE_RETRY
     async def free_style_batch_update(
@@ -218,12 +379,105 @@ class AsyncSheetsClient:
 
         async def make_request(headers: dict) -> httpx.Response:
             return await self._client.post(
-                f"{SHEETS_BASE_URL}/{spreadsheet_id}/values:batchUpdate",
+                f"{self.base_url}/{spreadsheet_id}/values:batchUpdate",
                 headers=headers,
                 json={"valueInputOption": "USER_ENTERED", "data": data},
             )
 
-        await self._execute_with_key_rotation(make_request)
+        await self._execute_with_key_rotation(
+            make_request, QuotaKind.WRITE, "free_style_batch_update"
+        )
+
+    @SHEETS_READ_RETRY
+    async def _fetch_sheet_ids(self, spreadsheet_id: str) -> dict[str, int]:
+        logger.info(
+            f"AsyncSheetsClient.get_sheet_ids: spreadsheet={spreadsheet_id[:8]}…"
+        )
+
+        async def make_request(headers: dict) -> httpx.Response:
+            return await self._client.get(
+                f"{self.base_url}/{spreadsheet_id}",
+                headers=headers,
+                params={"fields": "sheets.properties(sheetId,title)"},
+            )
+
+        _, resp = await self._execute_with_key_rotation(
+            make_request, QuotaKind.READ, "get_sheet_ids"
+        )
+        return {
+            sheet["properties"]["title"]: sheet["properties"]["sheetId"]
+            for sheet in resp.json().get("sheets", [])
+        }
+
+    async def get_sheet_ids(
+        self, spreadsheet_id: str, refresh: bool = False
+    ) -> dict[str, int]:
+        """Map sheet titles to their numeric sheetId (cached per spreadsheet)."""
+        if refresh or spreadsheet_id not in self._sheet_ids:
+            self._sheet_ids[spreadsheet_id] = await self._fetch_sheet_ids(
+                spreadsheet_id
+            )
+        return self._sheet_ids[spreadsheet_id]
+
+    @SHEETS_WRITE_RETRY
+    async def spreadsheet_batch_update(
+        self, spreadsheet_id: str, requests: list[dict[str, Any]]
+    ) -> None:
+        """Apply `spreadsheets:batchUpdate` requests atomically (all or none)."""
+        if not requests:
+            return
+        logger.info(
+            f"AsyncSheetsClient.spreadsheet_batch_update: spreadsheet={spreadsheet_id[:8]}… "
+            f"requests={len(requests)}"
+        )
+
+        async def make_request(headers: dict) -> httpx.Response:
+            return await self._client.post(
+                f"{self.base_url}/{spreadsheet_id}:batchUpdate",
+                headers=headers,
+                json={"requests": requests},
+            )
 
+        await self._execute_with_key_rotation(
+            make_request, QuotaKind.WRITE, "spreadsheet_batch_update"
+        )
+
+    async def write_and_clear(
+        self,
+        spreadsheet_id: str,
+        data: list[dict[str, Any]],
+        clear_ranges: list[str] | None = None,
+        max_rows: int | None = None,
+    ) -> None:
+        """Apply value writes (`values:batchUpdate`-style data) and clears as
+        `spreadsheets:batchUpdate` requests.
+
+        Clears are applied first, so a write may land inside a cleared range. Writes are
+        split into `updateCells` of at most `max_rows` rows; the result is sent as one
+        request, or as several in order when it exceeds MAX_PAYLOAD_BYTES, in which case
+        each request is atomic on its own.
+        """
+
+        def build(sheet_ids: dict[str, int]) -> list[dict[str, Any]]:
+            builder = SheetsRequestBuilder(sheet_ids, max_rows=max_rows)
+            for a1_range in clear_ranges or []:
+                builder.add_clear(a1_range)
+            builder.add_value_ranges(data)
+            return builder.requests
+
+        try:
+            requests = build(await self.get_sheet_ids(spreadsheet_id))
+        except KeyError:
+            # A sheet was added or renamed since the ids were cached
+            requests = build(await self.get_sheet_ids(spreadsheet_id, refresh=True))
+
+        payloads = split_payloads(requests)
+        if len(payloads) > 1:
+            logger.info(
+                f"AsyncSheetsClient.write_and_clear: {len(requests)} requests split "
+                f"into {len(payloads)} batchUpdate calls"
+            )
+        for payload in payloads:
+            await self.spreadsheet_batch_update(spreadsheet_id, payload)
 
 async_sheets_client = AsyncSheetsClient()
@@ -1,12 +1,22 @@
-import itertools
 import json
 import logging
+import time
 from pathlib import Path
-from typing import Final
+from typing import Final, Iterable
+
+from pydantic import BaseModel
 
 logger = logging.getLogger(__name__)
 
 
+class KeyHealth(BaseModel):
+    cooldown_until: float = 0.0  # time.monotonic() before which the key is not handed out (429)
+    forbidden_until: float = 0.0  # same, after the key returned 403 where another key succeeded
+    in_flight: int = 0  # requests currently being sent with this key
+    recent_429s: int = 0  # 429s since the key last succeeded
+    last_used: float = 0.0  # time.monotonic() of the last selection
+
+
 class KeyRotationPool:
     def __init__(self, keys_folder: str) -> None:
         folder = Path(keys_folder)
@@ -19,7 +29,7 @@ class KeyRotationPool:
             (path.name, json.loads(path.read_text()))
             for path in key_files
         ]
-        self._cycle = itertools.cycle(self._keys)
+        self._health: dict[str, KeyHealth] = {name: KeyHealth() for name, _ in self._keys}
         self._pool_size: int = len(self._keys)
 
         filenames: Final[list[str]] = [name for name, _ in self._keys]
@@ -29,8 +39,114 @@ class KeyRotationPool:
     def pool_size(self) -> int:
         return self._pool_size
 
-    def get_next_key(self) -> tuple[str, dict]:
-        """Return the next key in round-robin order and log the selection."""
-        filename, key_data = next(self._cycle)
+    @property
+    def keys(self) -> list[tuple[str, dict]]:
+        return list(self._keys)
+
+    def select_key(
+        self,
+        exclude: Iterable[str] = (),
+        quota_levels: dict[str, float | None] | None = None,
+        allow_forbidden: bool = False,
+    ) -> tuple[str, dict] | None:
+        """Return the least-loaded healthy key, or None if every candidate is cooling down.
+
+        Keys in `exclude` or inside a cool-down window are skipped (403 cool-downs are
+        ignored when `allow_forbidden` is set). Among the rest the pick prefers the most
+        remaining estimated quota (`quota_levels`, tokens per key), then fewest in-flight
+        requests, fewest recent 429s and least recent use.
+        """
+        now = time.monotonic()
+        excluded = set(exclude)
+        quota_levels = quota_levels or {}
+
+        candidates = [
+            (name, key_data)
+            for name, key_data in self._keys
+            if name not in excluded
+            and self._health[name].cooldown_until <= now
+            and (allow_forbidden or self._health[name].forbidden_until <= now)
+        ]
+        if not candidates:
+            return None
+
+        def load(candidate: tuple[str, dict]) -> tuple:
+            name = candidate[0]
+            health = self._health[name]
+            quota = quota_levels.get(name)
+            return (
+                -(quota if quota is not None else float("inf")),
+                health.in_flight,
+                health.recent_429s,
+                health.last_used,
+            )
+
+        filename, key_data = min(candidates, key=load)
+        self._health[filename].last_used = now
         logger.debug(f"KeyRotationPool: selected key {filename}")
         return filename, key_data
+
+    def get_next_key(self) -> tuple[str, dict]:
+        """Return the least-loaded healthy key, or the one whose cool-down ends first."""
+        selected = self.select_key()
+        if selected is not None:
+            return selected
+        return min(
+            self._keys,
+            key=lambda key: max(
+                self._health[key[0]].cooldown_until, self._health[key[0]].forbidden_until
+            ),
+        )
+
+    def seconds_until_available(
+        self, exclude: Iterable[str] = (), allow_forbidden: bool = False
+    ) -> float | None:
+        """Seconds until the first non-excluded key leaves its 429 cool-down.
+
+        Keys sidelined after a 403 are only considered when `allow_forbidden` is set.
+        Returns None when no such key exists — waiting would not help.
+        """
+        now = time.monotonic()
+        excluded = set(exclude)
+        cooldowns = [
+            health.cooldown_until
+            for name, health in self._health.items()
+            if name not in excluded
+            and (allow_forbidden or health.forbidden_until <= now)
+        ]
+        if not cooldowns:
+            return None
+        return max(0.0, min(cooldowns) - now)
+
+    def mark_in_flight(self, filename: str) -> None:
+        self._health[filename].in_flight += 1
+
+    def mark_done(self, filename: str) -> None:
+        self._health[filename].in_flight -= 1
+
+    def report_success(self, filename: str) -> None:
+        self._health[filename].recent_429s = 0
+
+    def report_rate_limited(self, filename: str, cooldown: float) -> None:
+        """Take a key out of rotation for `cooldown` seconds after a 429."""
+        health = self._health[filename]
+        health.recent_429s += 1
+        health.cooldown_until = max(health.cooldown_until, time.monotonic() + cooldown)
+
+    def report_forbidden(self, filename: str, cooldown: float) -> None:
+        """Take a key out of rotation for `cooldown` seconds after a 403."""
+        health = self._health[filename]
+        health.forbidden_until = max(health.forbidden_until, time.monotonic() + cooldown)
+
+    def health(self) -> dict[str, dict]:
+        """Per-key health snapshot for monitoring, with cool-downs as seconds remaining."""
+        now = time.monotonic()
+        return {
+            name: {
+                "cooldown_remaining": round(max(0.0, health.cooldown_until - now), 1),
+                "forbidden_remaining": round(max(0.0, health.forbidden_until - now), 1),
+                "in_flight": health.in_flight,
+                "recent_429s": health.recent_429s,
+            }
+            for name, health in self._health.items()
+        }
@@ -1,12 +1,21 @@
+import math
 from datetime import datetime
 
 from typing import Annotated, Final, Self, TypeVar, Generic, Any
 
-from pydantic import BaseModel, ConfigDict, ValidationError, field_validator
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    PrivateAttr,
+    ValidationError,
+    field_validator,
+)
 
 from . import async_sheets_client
 from .exceptions import SheetError
-from ..utils import formated_datetime
+from .utils import col_to_index, group_contiguous, index_to_col, plan_write_blocks
+from .. import config
+from ..utils import formated_datetime, strip_note_timestamp
 
 T = TypeVar("T")
 
@@ -14,6 +23,54 @@ COL_META: Final[str] = "col_name_xxx"
 IS_UPDATE_META: Final[str] = "is_update_xxx"
 IS_NOTE_META: Final[str] = "is_note_xxx"
 
+# Rows missing between two requested indexes that are still read as part of the
+# same block — a few wasted cells are cheaper than an extra range in the request.
+READ_ROW_GAP_TOLERANCE: Final[int] = 3
+
+
+def _number_text(number: int | float) -> str:
+    # 12345.0 and 12345 are the same cell value
+    if isinstance(number, float) and number.is_integer():
+        return str(int(number))
+    return str(number)
+
+
+def _cell_value(row: list[Any], offset: int) -> Any:
+    # Blank cells inside a block come back as "" — treat them like an empty range
+    val = row[offset] if offset < len(row) else None
+    if val == "":
+        return None
+    if isinstance(val, str):
+        val = val.strip()
+    elif isinstance(val, bool):
+        val = "TRUE" if val else "FALSE"
+    elif isinstance(val, (int, float)):
+        # Rows are read unformatted, so number cells arrive as numbers
+        val = _number_text(val)
+    return val
+
+
+def _is_run_value(val: Any) -> bool:
+    # A logging row runs when its col A holds anything but whitespace
+    if val is None:
+        return False
+    if not isinstance(val, str):
+        val = str(val)
+    return bool(val.strip())
+
+
+def _comparable(val: Any) -> str:
+    # Empty cells read back as None, and cell text is stripped on read. Numbers compare
+    # by value, as the sheet stores them: "12345.0" written by a model reads back 12345.
+    if val is None:
+        return ""
+    text = str(val).strip()
+    try:
+        number = float(text)
+    except ValueError:
+        return text
+    return _number_text(number) if math.isfinite(number) else text
+
 
 class NoteMessageUpdatePayload(BaseModel):
     index: int
@@ -33,6 +90,10 @@ class ColSheetModel(BaseModel):
     sheet_name: str
     index: int
 
+    # Updatable field values as last read from / written to the sheet.
+    # None means the sheet content is unknown and every updatable field is written.
+    _snapshot: dict[str, Any] | None = PrivateAttr(default=None)
+
     @classmethod
     def mapping_fields(cls) -> dict:
         mapping_fields = {}
@@ -61,6 +122,164 @@ class ColSheetModel(BaseModel):
 
         return mapping_fields
 
+    @classmethod
+    def note_mapping_fields(cls) -> dict:
+        mapping_fields = {}
+        for field_name, field_info in cls.model_fields.items():
+            if hasattr(field_info, "metadata"):
+                for metadata in field_info.metadata:
+                    if (
+                        COL_META in metadata
+                        and IS_NOTE_META in metadata
+                        and metadata[IS_NOTE_META]
+                    ):
+                        mapping_fields[field_name] = metadata[COL_META]
+                        break
+
+        return mapping_fields
+
+    def remember_values(self, values: dict[str, Any] | None = None) -> None:
+        """Record the sheet content of this row's updatable fields.
+
+        Args:
+            values: Field values currently in the sheet. Defaults to the model's own
+                values, i.e. "the sheet now matches this model".
+        """
+        if values is None:
+            values = self.model_dump(mode="json", include=set(self.updated_mapping_fields()))
+        self._snapshot = {k: values.get(k) for k in self.updated_mapping_fields()}
+
+    def dirty_fields(self) -> list[str]:
+        """Return the updatable fields whose value differs from the remembered sheet content.
+
+        Note fields start with a timestamp that changes every round, so they are compared
+        without it and only count as dirty when their text changed or another field of the
+        row is written anyway. Set ALWAYS_WRITE_NOTE to rewrite note fields unconditionally.
+        """
+        mapping_dict = self.updated_mapping_fields()
+        if self._snapshot is None:
+            return list(mapping_dict)
+
+        note_fields = self.note_mapping_fields()
+        model_dict = self.model_dump(mode="json", include=set(mapping_dict))
+
+        dirty = [
+            k
+            for k in mapping_dict
+            if k not in note_fields
+            and _comparable(model_dict[k]) != _comparable(self._snapshot.get(k))
+        ]
+        for k in note_fields:
+            if k not in mapping_dict:
+                continue
+            if (
+                dirty
+                or config.ALWAYS_WRITE_NOTE
+                or strip_note_timestamp(_comparable(model_dict[k]))
+                != strip_note_timestamp(_comparable(self._snapshot.get(k)))
+            ):
+                dirty.append(k)
+
+        return [k for k in mapping_dict if k in dirty]
+
+    @classmethod
+    def column_bounds(cls) -> tuple[int, int]:
+        """Return the 1-based (first, last) column indexes covered by the mapped fields."""
+        col_indexes = [col_to_index(col) for col in cls.mapping_fields().values()]
+        return min(col_indexes), max(col_indexes)
+
+    @classmethod
+    def grid_offsets(cls) -> dict[str, int]:
+        """Return field_name -> 0-based offset of its column within a block read."""
+        first_col, _ = cls.column_bounds()
+        return {
+            field_name: col_to_index(col) - first_col
+            for field_name, col in cls.mapping_fields().items()
+        }
+
+    @staticmethod
+    def parse_grid_row(row: list[Any], offsets: dict[str, int]) -> dict[str, Any]:
+        """Slice one row of a block read into field values using `grid_offsets()`."""
+        return {
+            field_name: _cell_value(row, offset) for field_name, offset in offsets.items()
+        }
+
+    @classmethod
+    async def read_rows(
+        cls,
+        sheet_id: str,
+        sheet_name: str,
+        indexes: list[int],
+    ) -> dict[int, dict[str, Any]]:
+        """Read the mapped columns of the given rows as a few rectangular blocks.
+
+        Indexes are grouped into contiguous runs and every run is fetched as a single
+        `{first_col}{start}:{last_col}{end}` range, then sliced back per row locally.
+        Cells are read unformatted, so number cells compare with model values by
+        value rather than by their display format.
+
+        Returns:
+            Mapping of row index -> {field_name: cell value}, for every requested index.
+        """
+        first_col, last_col = cls.column_bounds()
+        runs = group_contiguous(indexes, max_gap=READ_ROW_GAP_TOLERANCE)
+        ranges = [
+            f"{sheet_name}!{index_to_col(first_col)}{start}:{index_to_col(last_col)}{end}"
+            for start, end in runs
+        ]
+
+        response = await async_sheets_client.batch_get(
+            sheet_id, ranges, value_render_option="UNFORMATTED_VALUE"
+        )
+        value_ranges = response.get("valueRanges", [])
+
+        offsets = cls.grid_offsets()
+        wanted = set(indexes)
+        rows: dict[int, dict[str, Any]] = {}
+        for i, (start, end) in enumerate(runs):
+            grid = value_ranges[i].get("values", []) if i < len(value_ranges) else []
+            for index in range(start, end + 1):
+                if index not in wanted:
+                    continue
+                offset = index - start
+                rows[index] = cls.parse_grid_row(
+                    grid[offset] if offset < len(grid) else [], offsets
+                )
+
+        return rows
+
+    @classmethod
+    async def read_rows_from(
+        cls,
+        sheet_id: str,
+        sheet_name: str,
+        start_row: int,
+        end_row: int | None = None,
+    ) -> list[dict[str, Any]]:
+        """Read every row from `start_row` down to the last non-empty one as a single block.
+
+        Args:
+            end_row: Optional last row to read (inclusive); open-ended by default.
+
+        Returns:
+            One {field_name: cell value} dict per row, starting at `start_row`.
+        """
+        first_col, last_col = cls.column_bounds()
+        end = "" if end_row is None else str(end_row)
+        response = await async_sheets_client.batch_get(
+            sheet_id,
+            [
+                f"{sheet_name}!{index_to_col(first_col)}{start_row}"
+                f":{index_to_col(last_col)}{end}"
+            ],
+            value_render_option="UNFORMATTED_VALUE",
+        )
+        value_ranges = response.get("valueRanges", [])
+        grid = value_ranges[0].get("values", []) if value_ranges else []
+
+        offsets = cls.grid_offsets()
+        return [cls.parse_grid_row(row, offsets) for row in grid]
+
     @classmethod
     async def get(
         cls,
@@ -68,30 +287,18 @@ class ColSheetModel(BaseModel):
         sheet_name: str,
         index: int,
     ) -> Self:
-        mapping_dict = cls.mapping_fields()
-        ranges = [f"{sheet_name}!{col}{index}" for _, col in mapping_dict.items()]
-
-        response = await async_sheets_client.batch_get(sheet_id, ranges)
-        value_ranges = response.get("valueRanges", [])
+        rows = await cls.read_rows(sheet_id, sheet_name, [index])
 
         model_dict = {
             "index": index,
             "sheet_id": sheet_id,
             "sheet_name": sheet_name,
+            **rows[index],
         }
 
-        for i, (field_name, _) in enumerate(mapping_dict.items()):
-            raw = (
-                value_ranges[i].get("values", [[None]])
-                if i < len(value_ranges)
-                else [[None]]
-            )
-            val = raw[0][0] if raw and raw[0] else None
-            if isinstance(val, str):
-                val = val.strip()
-            model_dict[field_name] = val
-
-        return cls.model_validate(model_dict)
+        model = cls.model_validate(model_dict)
+        model.remember_values(rows[index])
+        return model
 
     @classmethod
     async def batch_get(
@@ -100,42 +307,36 @@ class ColSheetModel(BaseModel):
         sheet_name: str,
         indexes: list[int],
     ) -> list[Self]:
-        mapping_dict = cls.mapping_fields()
+        rows = await cls.read_rows(sheet_id, sheet_name, indexes)
+        return await cls.from_rows(sheet_id, sheet_name, indexes, rows)
 
+    @classmethod
+    async def from_rows(
+        cls,
+        sheet_id: str,
+        sheet_name: str,
+        indexes: list[int],
+        rows: dict[int, dict[str, Any]],
+    ) -> list[Self]:
+        """Build models from already-read row values, as `batch_get` does after reading.
+
+        Rows that fail validation get an error note written instead of a model.
+        """
         result_list: list[Self] = []
         error_list: list[NoteMessageUpdatePayload] = []
 
-        ranges = []
-        for index in indexes:
-            for _, col in mapping_dict.items():
-                ranges.append(f"{sheet_name}!{col}{index}")
-
-        response = await async_sheets_client.batch_get(sheet_id, ranges)
-        value_ranges = response.get("valueRanges", [])
-
-        count = 0
-
         for index in indexes:
             model_dict = {
                 "index": index,
                 "sheet_id": sheet_id,
                 "sheet_name": sheet_name,
+                **rows.get(index, {}),
             }
 
-            for field_name, _ in mapping_dict.items():
-                raw = (
-                    value_ranges[count].get("values", [[None]])
-                    if count < len(value_ranges)
-                    else [[None]]
-                )
-                val = raw[0][0] if raw and raw[0] else None
-                if isinstance(val, str):
-                    val = val.strip()
-                model_dict[field_name] = val
-                count += 1
-
             try:
-                result_list.append(cls.model_validate(model_dict))
+                model = cls.model_validate(model_dict)
+                model.remember_values(rows.get(index, {}))
+                result_list.append(model)
             except ValidationError as e:
                 error_list.append(
                     NoteMessageUpdatePayload(
@@ -151,45 +352,77 @@ class ColSheetModel(BaseModel):
         return result_list
 
     @classmethod
-    async def batch_update(
+    def build_update_batch(
         cls,
-        sheet_id: str,
         sheet_name: str,
         list_object: list[Self],
-    ) -> None:
+    ) -> list[dict[str, Any]]:
+        """Build `values:batchUpdate` data for the dirty fields of `list_object`.
+
+        Only fields reported by `dirty_fields()` are written. Adjacent columns and
+        consecutive rows are merged into rectangular ranges carrying 2D `values`
+        arrays (see `plan_write_blocks`).
+        """
+        return cls._build_update_data(
+            sheet_name, [(object, object.dirty_fields()) for object in list_object]
+        )
+
+    @classmethod
+    def _build_update_data(
+        cls,
+        sheet_name: str,
+        dirty_objects: list[tuple[Self, list[str]]],
+    ) -> list[dict[str, Any]]:
+        """`build_update_batch` over (object, dirty fields) pairs computed by the caller."""
         mapping_dict = cls.updated_mapping_fields()
-        update_batch = []
+        col_indexes = {k: col_to_index(v) for k, v in mapping_dict.items()}
 
-        for object in list_object:
+        cells: dict[int, dict[int, Any]] = {}
+        for object, dirty in dirty_objects:
+            if not dirty:
+                continue
             model_dict = object.model_dump(mode="json")
+            cells[object.index] = {col_indexes[k]: model_dict[k] for k in dirty}
 
-            for k, v in mapping_dict.items():
-                update_batch.append(
-                    {
-                        "range": f"{sheet_name}!{v}{object.index}",
-                        "values": [[model_dict[k]]],
-                    }
-                )
+        return [
+            {
+                "range": f"{sheet_name}!{index_to_col(block.start_col)}{block.start_row}"
+                f":{index_to_col(block.end_col)}{block.end_row}",
+                "values": block.values,
+            }
+            for block in plan_write_blocks(cells)
+        ]
 
-        if len(list_object) > 0:
+    @classmethod
+    async def batch_update(
+        cls,
+        sheet_id: str,
+        sheet_name: str,
+        list_object: list[Self],
+    ) -> int:
+        """Write the dirty fields of `list_object`. Returns the number of rows written."""
+        written = [
+            (object, dirty)
+            for object in list_object
+            if (dirty := object.dirty_fields())
+        ]
+        update_batch = cls._build_update_data(sheet_name, written)
+
+        if len(update_batch) > 0:
             await async_sheets_client.batch_update(sheet_id, update_batch)
 
+        for object, _ in written:
+            object.remember_values()
+
+        return len(written)
+
     async def update(
         self,
     ) -> None:
-        mapping_dict = self.updated_mapping_fields()
-        model_dict = self.model_dump(mode="json")
-
-        update_batch = []
-        for k, v in mapping_dict.items():
-            update_batch.append(
-                {
-                    "range": f"{self.sheet_name}!{v}{self.index}",
-                    "values": [[model_dict[k]]],
-                }
-            )
+        update_batch = self.build_update_batch(self.sheet_name, [self])
 
         await async_sheets_client.batch_update(self.sheet_id, update_batch)
+        self.remember_values()
 
     @classmethod
     async def update_note_message(
@@ -348,12 +581,19 @@ class RowModel(ColSheetModel):
         run_indexes = []
         for idx, row in enumerate(rows, start=1):
             value = row[0] if row else ""
-            if not isinstance(value, str):
-                value = str(value)
-            if value.strip():
+            if _is_run_value(value):
                 run_indexes.append(idx)
         return run_indexes
 
+    @classmethod
+    def run_indexes_from_rows(cls, rows: dict[int, dict[str, Any]]) -> list[int]:
+        """`get_run_indexes` over rows that were already read (col A is `Code_Prefix`)."""
+        return [
+            index
+            for index, row in sorted(rows.items())
+            if _is_run_value(row.get("Code_Prefix"))
+        ]
+
 
 class ListingRowModel(ColSheetModel):
     CHECK: Annotated[
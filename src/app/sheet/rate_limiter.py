@@ -0,0 +1,97 @@
+import asyncio
+import logging
+import time
+
+from .enums import QuotaKind
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Classic token bucket: refills at `per_minute / 60` tokens per second up to `capacity`."""
+
+    def __init__(self, per_minute: float, capacity: float) -> None:
+        self._rate = per_minute / 60.0
+        self._capacity = max(capacity, 1.0)
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()  # waiters are served in FIFO order
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    @property
+    def level(self) -> float:
+        """Tokens currently available (may be fractional)."""
+        self._refill()
+        return self._tokens
+
+    @property
+    def capacity(self) -> float:
+        return self._capacity
+
+    async def acquire(self) -> float:
+        """Take one token, sleeping until one is available. Returns the seconds waited."""
+        waited = 0.0
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                waited = (1 - self._tokens) / self._rate
+                await asyncio.sleep(waited)
+                self._refill()
+            self._tokens -= 1
+        return waited
+
+
+class KeyRateLimiter:
+    """Per service-account key token buckets, with read and write quotas tracked separately.
+
+    A per-minute limit of 0 disables pacing for that quota kind.
+    """
+
+    def __init__(
+        self, read_per_minute: float, write_per_minute: float, burst: int
+    ) -> None:
+        self._per_minute = {
+            QuotaKind.READ: read_per_minute,
+            QuotaKind.WRITE: write_per_minute,
+        }
+        self._burst = burst
+        self._buckets: dict[tuple[str, QuotaKind], TokenBucket] = {}
+
+    def _bucket(self, filename: str, kind: QuotaKind) -> TokenBucket | None:
+        per_minute = self._per_minute[kind]
+        if per_minute <= 0:
+            return None
+        key = (filename, kind)
+        if key not in self._buckets:
+            self._buckets[key] = TokenBucket(per_minute, capacity=self._burst)
+        return self._buckets[key]
+
+    async def acquire(self, filename: str, kind: QuotaKind) -> float:
+        """Wait for quota on `filename` before sending a request. Returns the seconds waited."""
+        bucket = self._bucket(filename, kind)
+        if bucket is None:
+            return 0.0
+        waited = await bucket.acquire()
+        if waited > 0:
+            logger.debug(
+                f"KeyRateLimiter: paced {kind.value} request on key {filename} by {waited:.2f}s"
+            )
+        return waited
+
+    def level(self, filename: str, kind: QuotaKind) -> float | None:
+        """Tokens available for `filename`, or None when `kind` is not rate limited."""
+        bucket = self._bucket(filename, kind)
+        return bucket.level if bucket is not None else None
+
+    def levels(self) -> dict[str, dict[str, float]]:
+        """Current bucket levels for monitoring: {filename: {"read": float, "write": float}}."""
+        snapshot: dict[str, dict[str, float]] = {}
+        for (filename, kind), bucket in sorted(
+            self._buckets.items(), key=lambda item: (item[0][0], item[0][1].value)
+        ):
+            snapshot.setdefault(filename, {})[kind.value] = round(bucket.level, 2)
+        return snapshot
@@ -0,0 +1,211 @@
+import json
+import re
+from datetime import datetime
+from typing import Any, Final
+
+from gspread.utils import a1_range_to_grid_range
+
+from ..utils import DATETIME_FORMAT
+
+# Plain decimal numbers, the one case USER_ENTERED parsing we need to mirror exactly
+# (prices and process times written as strings must stay numeric in the sheet)
+NUMBER_PATTERN: Final[re.Pattern] = re.compile(r"^-?\d+(\.\d+)?$")
+# A whole cell holding a formated_datetime timestamp (e.g. the listing Note column)
+DATETIME_PATTERN: Final[re.Pattern] = re.compile(
+    r"^\d{2}/\d{2}/\d{4} \d{2}:\d{2}:\d{2}$"
+)
+# Sheets date-time serial numbers count days from this epoch
+SERIAL_EPOCH: Final[datetime] = datetime(1899, 12, 30)
+# DATETIME_FORMAT in Sheets number-format syntax, so dates display as they were written
+DATETIME_NUMBER_FORMAT: Final[dict[str, str]] = {
+    "type": "DATE_TIME",
+    "pattern": "dd/mm/yyyy hh:mm:ss",
+}
+VALUE_FIELDS: Final[str] = "userEnteredValue"
+DATETIME_FIELDS: Final[str] = "userEnteredValue,userEnteredFormat.numberFormat"
+# Google recommends keeping Sheets API request bodies under 2 MB
+MAX_PAYLOAD_BYTES: Final[int] = 2_000_000
+
+
+def split_a1_range(a1_range: str) -> tuple[str, str]:
+    """Split "Sheet!B4:J8" (or "'My sheet'!B4:J8") into the sheet name and the cell range."""
+    sheet_name, _, cells = a1_range.rpartition("!")
+    if len(sheet_name) >= 2 and sheet_name[0] == sheet_name[-1] == "'":
+        sheet_name = sheet_name[1:-1].replace("''", "'")
+    return sheet_name, cells
+
+
+def parse_datetime_cell(value: Any) -> datetime | None:
+    """The datetime of a cell value written by formated_datetime, else None."""
+    if not isinstance(value, str) or not DATETIME_PATTERN.match(value):
+        return None
+    try:
+        return datetime.strptime(value, DATETIME_FORMAT)
+    except ValueError:
+        return None
+
+
+def cell_data(value: Any) -> dict[str, Any]:
+    """CellData for a value, typed the way USER_ENTERED input would mostly type it.
+
+    formated_datetime timestamps become date-time serial numbers with a matching
+    DATE_TIME number format, as USER_ENTERED stores them in a dd/mm locale; they only
+    take effect under the DATETIME_FIELDS mask. Other dates and any other
+    locale-dependent parsing are not mirrored and are written as text.
+    """
+    if isinstance(value, bool):
+        return {"userEnteredValue": {"boolValue": value}}
+    if isinstance(value, (int, float)):
+        return {"userEnteredValue": {"numberValue": value}}
+    text = str(value)
+    if text == "":
+        # No value under the userEnteredValue mask clears the cell
+        return {}
+    if text.startswith("="):
+        return {"userEnteredValue": {"formulaValue": text}}
+    if NUMBER_PATTERN.match(text):
+        number = float(text) if "." in text else int(text)
+        return {"userEnteredValue": {"numberValue": number}}
+    timestamp = parse_datetime_cell(text)
+    if timestamp is not None:
+        serial = (timestamp - SERIAL_EPOCH).total_seconds() / 86400
+        return {
+            "userEnteredValue": {"numberValue": serial},
+            "userEnteredFormat": {"numberFormat": DATETIME_NUMBER_FORMAT},
+        }
+    return {"userEnteredValue": {"stringValue": text}}
+
+
+def split_payloads(
+    requests: list[dict[str, Any]], max_bytes: int = MAX_PAYLOAD_BYTES
+) -> list[list[dict[str, Any]]]:
+    """Group requests, in order, into batchUpdate bodies of at most ~`max_bytes` each.
+
+    A single request larger than `max_bytes` gets a body of its own.
+    """
+    payloads: list[list[dict[str, Any]]] = []
+    size = 0
+    for request in requests:
+        request_size = len(json.dumps(request, separators=(",", ":")))
+        if not payloads or size + request_size > max_bytes:
+            payloads.append([])
+            size = 0
+        payloads[-1].append(request)
+        size += request_size
+    return payloads
+
+
+class SheetsRequestBuilder:
+    """Collect value writes and clears as `spreadsheets:batchUpdate` requests.
+
+    Writes become `updateCells` and clears become `repeatCell` with an empty cell, both
+    masked to `userEnteredValue` so formatting is left alone, like the values API.
+    Columns holding timestamps get their own `updateCells`, also masked to the number
+    format (see `cell_data`), so the other cells of such a column are reset to the
+    automatic number format. `updateCells` span at most `max_rows` rows each.
+    """
+
+    def __init__(self, sheet_ids: dict[str, int], max_rows: int | None = None) -> None:
+        self.sheet_ids = sheet_ids
+        self.max_rows = max_rows
+        self.requests: list[dict[str, Any]] = []
+
+    def __len__(self) -> int:
+        return len(self.requests)
+
+    def _grid_range(self, a1_range: str) -> dict[str, int]:
+        sheet_name, cells = split_a1_range(a1_range)
+        if sheet_name not in self.sheet_ids:
+            raise KeyError(f"SheetsRequestBuilder: unknown sheet '{sheet_name}'")
+        return {"sheetId": self.sheet_ids[sheet_name], **a1_range_to_grid_range(cells)}
+
+    def _update_cells(
+        self, sheet_id: int, row: int, col: int, values: list[list[Any]]
+    ) -> None:
+        """Add `updateCells` for a block, split at timestamp columns and every max_rows."""
+        width = max((len(row_values) for row_values in values), default=0)
+        datetime_cols = [
+            any(
+                c < len(row_values) and parse_datetime_cell(row_values[c]) is not None
+                for row_values in values
+            )
+            for c in range(width)
+        ]
+        step = self.max_rows or len(values) or 1
+        seg_start = 0
+        while seg_start < width:
+            seg_end = seg_start
+            while seg_end < width and datetime_cols[seg_end] == datetime_cols[seg_start]:
+                seg_end += 1
+            fields = DATETIME_FIELDS if datetime_cols[seg_start] else VALUE_FIELDS
+            for offset in range(0, len(values), step):
+                self.requests.append(
+                    {
+                        "updateCells": {
+                            "start": {
+                                "sheetId": sheet_id,
+                                "rowIndex": row + offset,
+                                "columnIndex": col + seg_start,
+                            },
+                            "rows": [
+                                {
+                                    "values": [
+                                        cell_data(v)
+                                        for v in row_values[seg_start:seg_end]
+                                    ]
+                                }
+                                for row_values in values[offset : offset + step]
+                            ],
+                            "fields": fields,
+                        }
+                    }
+                )
+            seg_start = seg_end
+
+    def add_values(self, a1_range: str, values: list[list[Any]]) -> None:
+        """Write `values` from the top-left corner of `a1_range`.
+
+        None cells are left untouched (as in `values:batchUpdate`): a block without any
+        becomes one `updateCells`, otherwise each row is split into runs of consecutive
+        non-None cells.
+        """
+        grid_range = self._grid_range(a1_range)
+        sheet_id = grid_range["sheetId"]
+        start_row = grid_range["startRowIndex"]
+        start_col = grid_range["startColumnIndex"]
+        if all(v is not None for row in values for v in row):
+            self._update_cells(sheet_id, start_row, start_col, values)
+            return
+
+        for row_offset, row in enumerate(values):
+            col = 0
+            while col < len(row):
+                if row[col] is None:
+                    col += 1
+                    continue
+                run_start = col
+                while col < len(row) and row[col] is not None:
+                    col += 1
+                self._update_cells(
+                    sheet_id,
+                    start_row + row_offset,
+                    start_col + run_start,
+                    [row[run_start:col]],
+                )
+
+    def add_value_ranges(self, data: list[dict[str, Any]]) -> None:
+        """Add `values:batchUpdate`-style {"range", "values"} entries."""
+        for value_range in data:
+            self.add_values(value_range["range"], value_range["values"])
+
+    def add_clear(self, a1_range: str) -> None:
+        """Clear cell values in `a1_range`; an open end ("A5:K") runs to the sheet's edge."""
+        self.requests.append(
+            {
+                "repeatCell": {
+                    "range": self._grid_range(a1_range),
+                    "cell": {},
+                    "fields": "userEnteredValue",
+                }
+            }
+        )
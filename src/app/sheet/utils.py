@@ -1,4 +1,6 @@
-from gspread.utils import a1_range_to_grid_range
+from typing import Any, Iterable
+
+from gspread.utils import a1_range_to_grid_range, column_letter_to_index
 from pydantic import BaseModel
 
 
@@ -11,3 +13,80 @@ class GridRange(BaseModel):
 
 def fri_a1_range_to_grid_range(name: str) -> GridRange:
     return GridRange.model_validate(a1_range_to_grid_range(name))
+
+
+def col_to_index(col: str) -> int:
+    """Convert a column letter to its 1-based index (e.g. "A" -> 1, "J" -> 10)."""
+    return column_letter_to_index(col)
+
+
+def index_to_col(index: int) -> str:
+    """Convert a 1-based column index to its letter (e.g. 1 -> "A", 27 -> "AA")."""
+    if index < 1:
+        raise ValueError("Column index must be >= 1")
+
+    col = ""
+    while index > 0:
+        index -= 1
+        col = chr(ord("A") + (index % 26)) + col
+        index //= 26
+    return col
+
+
+def group_contiguous(values: Iterable[int], max_gap: int = 0) -> list[tuple[int, int]]:
+    """Group row/column indexes into inclusive (start, end) runs.
+
+    Values are de-duplicated and sorted first. Two neighbouring values stay in the
+    same run when at most `max_gap` values are missing between them.
+
+    Example: group_contiguous([5, 3, 4, 9, 10]) -> [(3, 5), (9, 10)]
+    """
+    runs: list[tuple[int, int]] = []
+    for value in sorted(set(values)):
+        if runs and value - runs[-1][1] <= max_gap + 1:
+            runs[-1] = (runs[-1][0], value)
+        else:
+            runs.append((value, value))
+    return runs
+
+
+class WriteBlock(BaseModel):
+    start_row: int
+    end_row: int
+    start_col: int
+    end_col: int
+    values: list[list[Any]]
+
+
+def plan_write_blocks(cells: dict[int, dict[int, Any]]) -> list[WriteBlock]:
+    """Merge individual cell writes into as few rectangular blocks as possible.
+
+    Args:
+        cells: Mapping of 1-based row index -> {1-based column index: value}
+
+    Adjacent columns of a row are merged first; consecutive rows whose column runs
+    are identical are then stacked into one block with a 2D `values` array.
+    """
+    rows_by_col_run: dict[tuple[int, int], list[int]] = {}
+    for row, row_cells in cells.items():
+        for col_run in group_contiguous(row_cells):
+            rows_by_col_run.setdefault(col_run, []).append(row)
+
+    blocks: list[WriteBlock] = []
+    for (start_col, end_col), rows in rows_by_col_run.items():
+        for start_row, end_row in group_contiguous(rows):
+            blocks.append(
+                WriteBlock(
+                    start_row=start_row,
+                    end_row=end_row,
+                    start_col=start_col,
+                    end_col=end_col,
+                    values=[
+                        [cells[row][col] for col in range(start_col, end_col + 1)]
+                        for row in range(start_row, end_row + 1)
+                    ],
+                )
+            )
+
+    blocks.sort(key=lambda b: (b.start_row, b.start_col))
+    return blocks
@@ -0,0 +1,95 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class WriteCoalescer:
+    """Write-behind buffer that merges concurrent `values:batchUpdate` calls per spreadsheet.
+
+    Data submitted for the same spreadsheet is buffered only while more submissions keep
+    arriving: the flush is deferred one event-loop pass at a time and sent through `send`
+    on the first pass that brings no new submission (or once `max_ranges` ranges are
+    buffered). Writes issued together are merged, while a lone write waits no longer
+    than one pass. Every caller's `submit` resolves when the combined request completes,
+    and raises if it fails.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[str, list[dict[str, Any]]], Awaitable[None]],
+        max_ranges: int,
+    ) -> None:
+        self._send = send
+        self._max_ranges = max_ranges
+        # spreadsheet_id → buffered (data, future) entries / buffered range count /
+        # scheduled flush check
+        self._pending: dict[str, list[tuple[list[dict[str, Any]], asyncio.Future]]] = {}
+        self._pending_ranges: dict[str, int] = {}
+        self._checks: dict[str, asyncio.Handle] = {}
+        self._flushes: set[asyncio.Task] = set()
+
+    async def submit(self, spreadsheet_id: str, data: list[dict[str, Any]]) -> None:
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future = loop.create_future()
+
+        self._pending.setdefault(spreadsheet_id, []).append((data, future))
+        self._pending_ranges[spreadsheet_id] = (
+            self._pending_ranges.get(spreadsheet_id, 0) + len(data)
+        )
+
+        if self._pending_ranges[spreadsheet_id] >= self._max_ranges:
+            self._start_flush(spreadsheet_id)
+        elif spreadsheet_id not in self._checks:
+            self._schedule_check(spreadsheet_id)
+
+        await future
+
+    def _schedule_check(self, spreadsheet_id: str) -> None:
+        self._checks[spreadsheet_id] = asyncio.get_running_loop().call_soon(
+            self._check, spreadsheet_id, len(self._pending.get(spreadsheet_id, []))
+        )
+
+    def _check(self, spreadsheet_id: str, seen: int) -> None:
+        # Submissions made during the last loop pass may have more on their heels;
+        # flush once a pass went by without any
+        self._checks.pop(spreadsheet_id, None)
+        if len(self._pending.get(spreadsheet_id, [])) > seen:
+            self._schedule_check(spreadsheet_id)
+        else:
+            self._start_flush(spreadsheet_id)
+
+    def _start_flush(self, spreadsheet_id: str) -> None:
+        check = self._checks.pop(spreadsheet_id, None)
+        if check is not None:
+            check.cancel()
+        entries = self._pending.pop(spreadsheet_id, [])
+        self._pending_ranges.pop(spreadsheet_id, None)
+        if not entries:
+            return
+
+        task = asyncio.create_task(self._flush(spreadsheet_id, entries))
+        self._flushes.add(task)  # keep a reference until done
+        task.add_done_callback(self._flushes.discard)
+
+    async def _flush(
+        self,
+        spreadsheet_id: str,
+        entries: list[tuple[list[dict[str, Any]], asyncio.Future]],
+    ) -> None:
+        data = [item for entry_data, _ in entries for item in entry_data]
+        logger.info(
+            f"WriteCoalescer: flushing {len(entries)} write(s) / {len(data)} range(s) "
+            f"as one request — spreadsheet={spreadsheet_id[:8]}…"
+        )
+        try:
+            await self._send(spreadsheet_id, data)
+        except Exception as e:
+            for _, future in entries:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for _, future in entries:
+                if not future.done():
+                    future.set_result(None)
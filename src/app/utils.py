@@ -2,6 +2,8 @@ import re
 import time
 from datetime import datetime
 
+from typing import Any, Callable, Collection, Final, Hashable, Sequence
+
 from app import logger
 
 from .lapakgaming.models import Product as LapakgamingProduct
@@ -12,13 +14,27 @@ def sleep_for(delay: float) -> None:
     time.sleep(delay)
 
 
+# Format of the timestamps formated_datetime writes to the sheets
+DATETIME_FORMAT: Final[str] = "%d/%m/%Y %H:%M:%S"
+
+# Leading "dd/mm/YYYY HH:MM:SS" stamp written by formated_datetime at the start of notes
+NOTE_TIMESTAMP_PATTERN: Final[re.Pattern] = re.compile(
+    r"^\d{2}/\d{2}/\d{4} \d{2}:\d{2}:\d{2}\s*"
+)
+
+
 def formated_datetime(
     now: datetime,
 ) -> str:
-    formatted_date = now.strftime("%d/%m/%Y %H:%M:%S")
+    formatted_date = now.strftime(DATETIME_FORMAT)
     return formatted_date
 
 
+def strip_note_timestamp(note: str) -> str:
+    """Drop the leading formated_datetime stamp of a note, if any."""
+    return NOTE_TIMESTAMP_PATTERN.sub("", note, count=1)
+
+
 def split_list(lst: list, chunk_size: int) -> list[list]:
     """
     Split a list into smaller chunks of specified size
@@ -33,6 +49,113 @@ def split_list(lst: list, chunk_size: int) -> list[list]:
     return [lst[i : i + chunk_size] for i in range(0, len(lst), chunk_size)]
 
 
+class ListingKeywordMatcher:
+    """A listing sheet's include/exclude keywords, compiled once and applied column-wise.
+
+    Equivalent to running is_valid_listing_product over every product: each field's
+    keywords become one regex alternation, evaluated once per distinct field value, and
+    the per-field results are combined into a keep/drop mask.
+    """
+
+    def __init__(
+        self,
+        include_keywords: dict[str, list[str] | None],
+        exclude_keywords: dict[str, list[str] | None],
+    ) -> None:
+        # An empty include list matches nothing; an empty exclude list excludes nothing
+        self._include = {
+            field: self._compile(keywords)
+            for field, keywords in include_keywords.items()
+            if keywords is not None
+        }
+        self._exclude = {
+            field: self._compile(keywords)
+            for field, keywords in exclude_keywords.items()
+            if keywords
+        }
+
+    @staticmethod
+    def _compile(keywords: list[str]) -> re.Pattern | None:
+        if not keywords:
+            return None
+        return re.compile("|".join(re.escape(kw) for kw in keywords))
+
+    @property
+    def is_noop(self) -> bool:
+        return not self._include and not self._exclude
+
+    def mask(
+        self,
+        column: Callable[[str], Sequence[Any]],
+        size: int,
+        fields: Collection[str],
+    ) -> list[bool]:
+        """Return one keep flag per row.
+
+        Args:
+            column: Returns the values of a field, one per row.
+            size: Number of rows.
+            fields: Fields `column` knows; any other field reads as empty, like a
+                missing attribute in is_valid_listing_product.
+        """
+        keep = [True] * size
+        for patterns, wanted in ((self._include, True), (self._exclude, False)):
+            for field, pattern in patterns.items():
+                if pattern is None or field not in fields:
+                    # Every value is empty (or there is no keyword to find)
+                    if wanted:
+                        return [False] * size
+                    continue
+                hits: dict[Any, bool] = {}
+                for i, value in enumerate(column(field)):
+                    if not keep[i]:
+                        continue
+                    hit = hits.get(value)
+                    if hit is None:
+                        hit = hits[value] = bool(pattern.search(str(value or "")))
+                    if hit is not wanted:
+                        keep[i] = False
+        return keep
+
+
+def stable_layout(current_keys: list[Hashable | None], new_keys: list[Hashable]) -> list[Hashable]:
+    """Order `new_keys` so that keys already present keep their current position.
+
+    Keys that disappeared leave holes which are filled with new keys first; remaining new
+    keys are appended. If holes are left over (the list shrank), the last rows are moved
+    up into them so the result stays contiguous — only those rows change position.
+
+    Args:
+        current_keys: Row keys in their current order (None for blank rows)
+        new_keys: Row keys that must be present, in preferred order for new rows
+
+    Returns:
+        A permutation of `new_keys`.
+    """
+    wanted = set(new_keys)
+    slots: list[Hashable | None] = [key if key in wanted else None for key in current_keys]
+    placed = {key for key in slots if key is not None}
+    to_place = iter([key for key in new_keys if key not in placed])
+
+    for i, slot in enumerate(slots):
+        if slot is None:
+            slots[i] = next(to_place, None)
+    slots.extend(to_place)
+
+    # Compact: move trailing rows into the earliest remaining holes
+    hole = 0
+    while True:
+        while slots and slots[-1] is None:
+            slots.pop()
+        while hole < len(slots) and slots[hole] is not None:
+            hole += 1
+        if hole >= len(slots):
+            break
+        slots[hole] = slots.pop()
+
+    return slots  # type: ignore[return-value]
+
+
 def format_list_products(
     products: list[LapakgamingProduct],
 ) -> str:
@@ -84,6 +207,95 @@ def derive_codes_for_row(
     return matched
 
 
+def _is_word_char(char: str) -> bool:
+    # Same notion of a word character as `\b` in a str regex
+    return char.isalnum() or char == "_"
+
+
+def _dash_prefixes(code: str) -> set[str]:
+    r"""Return every PREFIX for which `\bPREFIX-` matches inside `code`."""
+    if "-" not in code:
+        return set()
+    boundaries = [
+        i
+        for i, char in enumerate(code)
+        if _is_word_char(char) != (i > 0 and _is_word_char(code[i - 1]))
+    ]
+    dashes = [i for i, char in enumerate(code) if char == "-"]
+    return {code[start:end] for start in boundaries for end in dashes if end > start}
+
+
+class ListingCodeIndex:
+    r"""Per-round inverted index over listing codes for derive_codes_for_row lookups.
+
+    Every code is bucketed under each (lower-cased) PREFIX it would match through
+    derive_codes_for_row's `\bPREFIX-` pattern, and within a bucket by country code.
+    `derive_codes` then answers a row's (Code_Prefix, country filter) lookup without
+    scanning the whole listing, returning codes in the same listing order.
+    """
+
+    def __init__(
+        self,
+        listing_codes: list[str | None],
+        listing_country_codes: list[str | None],
+    ) -> None:
+        self._codes = listing_codes
+        # prefix -> positions in listing order
+        self._by_prefix: dict[str, list[int]] = {}
+        # prefix -> country code -> positions in listing order
+        self._by_prefix_country: dict[str, dict[str | None, list[int]]] = {}
+        self._country_matches: dict[tuple[str, str | None], bool] = {}
+        self._results: dict[tuple[str, str | None], list[str]] = {}
+
+        for pos, (code, country) in enumerate(zip(listing_codes, listing_country_codes)):
+            if not code:
+                continue
+            for prefix in _dash_prefixes(code.lower()):
+                self._by_prefix.setdefault(prefix, []).append(pos)
+                self._by_prefix_country.setdefault(prefix, {}).setdefault(
+                    country, []
+                ).append(pos)
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def _country_matches_filter(self, country_filter: str, country: str | None) -> bool:
+        key = (country_filter, country)
+        if key not in self._country_matches:
+            country_pattern = re.compile(rf"(?i)\b({re.escape(country_filter)})")
+            self._country_matches[key] = bool(country) and bool(
+                country_pattern.search(country)  # type: ignore[arg-type]
+            )
+        return self._country_matches[key]
+
+    def derive_codes(
+        self,
+        col_a_prefix: str | None,
+        col_f_country_filter: str | None,
+    ) -> list[str]:
+        """Indexed equivalent of derive_codes_for_row over this listing."""
+        if not col_a_prefix:
+            return []
+
+        key = (col_a_prefix.lower(), col_f_country_filter or None)
+        if key not in self._results:
+            prefix, country_filter = key
+            if country_filter is None:
+                positions = self._by_prefix.get(prefix, [])
+            else:
+                positions = sorted(
+                    pos
+                    for country, country_positions in self._by_prefix_country.get(
+                        prefix, {}
+                    ).items()
+                    if self._country_matches_filter(country_filter, country)
+                    for pos in country_positions
+                )
+            self._results[key] = [self._codes[pos] for pos in positions]  # type: ignore[misc]
+
+        return list(self._results[key])
+
+
 def note_message(
     now: datetime,
     min_price_product: LapakgamingProduct | None,
@@ -0,0 +1,104 @@
+"""
+Benchmark: regex-scan derive_codes_for_row vs ListingCodeIndex.derive_codes.
+
+Run from the project root (settings.env / sheets_config.yaml are loaded on import of `app`):
+
+    PYTHONPATH=src uv run python -m benchmarks.derive_codes
+    PYTHONPATH=src uv run python -m benchmarks.derive_codes --sizes 1000 10000 --rows 200
+"""
+
+import argparse
+import random
+import time
+
+from app.lapakgaming.consts import COUNTRY_CODES
+from app.utils import ListingCodeIndex, derive_codes_for_row
+
+DEFAULT_SIZES: tuple[int, ...] = (1_000, 10_000, 100_000)
+
+
+def generate_listing(
+    size: int, prefix_count: int, rng: random.Random
+) -> tuple[list[str | None], list[str | None], list[str]]:
+    """Generate `size` listing codes spread over `prefix_count` game prefixes."""
+    prefixes = [f"G{i:03d}" for i in range(prefix_count)]
+    countries = list(COUNTRY_CODES)
+
+    codes: list[str | None] = []
+    country_codes: list[str | None] = []
+    for i in range(size):
+        prefix = rng.choice(prefixes)
+        country = rng.choice(countries)
+        # Mix in lower-case and nested prefixes to exercise the word-boundary rules
+        if i % 7 == 0:
+            prefix = prefix.lower()
+        code = f"{prefix}-{country.upper()}-{i}"
+        if i % 11 == 0:
+            code = f"X{code}"
+        elif i % 13 == 0:
+            code = f"PK-{code}"
+        codes.append(code)
+        country_codes.append(country)
+
+    return codes, country_codes, prefixes
+
+
+def generate_rows(
+    prefixes: list[str], rows: int, rng: random.Random
+) -> list[tuple[str, str | None]]:
+    countries = list(COUNTRY_CODES)
+    return [
+        (rng.choice(prefixes), rng.choice([None, rng.choice(countries).upper()]))
+        for _ in range(rows)
+    ]
+
+
+def bench(size: int, rows: int, prefix_count: int, seed: int) -> None:
+    rng = random.Random(seed)
+    codes, country_codes, prefixes = generate_listing(size, prefix_count, rng)
+    row_inputs = generate_rows(prefixes, rows, rng)
+
+    start = time.perf_counter()
+    scan_results = [
+        derive_codes_for_row(prefix, country_filter, codes, country_codes)
+        for prefix, country_filter in row_inputs
+    ]
+    scan_secs = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index = ListingCodeIndex(codes, country_codes)
+    build_secs = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index_results = [
+        index.derive_codes(prefix, country_filter)
+        for prefix, country_filter in row_inputs
+    ]
+    lookup_secs = time.perf_counter() - start
+
+    if scan_results != index_results:
+        raise AssertionError(f"index results differ from regex scan at size={size}")
+
+    speedup = scan_secs / (build_secs + lookup_secs)
+    print(
+        f"listing_codes={size:>7} rows={rows:>5} | "
+        f"regex scan {scan_secs * 1000:9.1f} ms | "
+        f"index build {build_secs * 1000:7.1f} ms + lookup {lookup_secs * 1000:7.1f} ms | "
+        f"speedup x{speedup:.1f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--rows", type=int, default=500, help="logging rows to resolve")
+    parser.add_argument("--prefixes", type=int, default=300, help="distinct game prefixes")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        bench(size, args.rows, args.prefixes, args.seed)
+
+
+if __name__ == "__main__":
+    main()
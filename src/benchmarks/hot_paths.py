@@ -0,0 +1,207 @@
+"""
+Micro-benchmarks of the per-round hot functions, on synthetic data (see fakes/synthetic.py).
+
+Run from the project root (settings.env / sheets_config.yaml are loaded on import of `app`):
+
+    PYTHONPATH=src uv run python -m benchmarks.hot_paths
+    PYTHONPATH=src uv run python -m benchmarks.hot_paths --products 50000 --rows 1000 --json
+
+`benchmarks.suite` runs this in a subprocess and records the results in its baseline.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import datetime
+from typing import Any, Callable
+
+from app.lapakgaming.catalog import FIELDS, ProductCatalog
+from app.lapakgaming.models import Product as LapakgamingProduct
+from app.processes import (
+    InExKeywordMapping,
+    is_valid_listing_product,
+    keyword_matcher,
+    min_lapakgaming_products,
+)
+from app.sheet.models import ListingRowModel, RowModel
+from app.utils import ListingCodeIndex, derive_codes_for_row, note_message
+from fakes.synthetic import (
+    COUNTRY_CODES,
+    game_prefixes,
+    generate_products,
+    product_record,
+    split_sizes,
+)
+
+# Regex-scanning every listing code per row is quadratic; keep its share of rows small
+SCAN_ROWS: int = 50
+
+
+def best_of(fn: Callable[[], Any], repeat: int) -> float:
+    """Fastest of `repeat` timed calls, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def build_products(
+    size: int, games: list[str], rng: random.Random
+) -> list[LapakgamingProduct]:
+    return [
+        LapakgamingProduct.model_construct(**product_record(values))
+        for cc, count in split_sizes(size, COUNTRY_CODES).items()
+        for values in generate_products(cc, count, games, rng)
+    ]
+
+
+def derive_all(
+    index: ListingCodeIndex, row_inputs: list[tuple[str | None, str | None]]
+) -> list[list[str]]:
+    """Index build (by the caller) plus one lookup per row, as a round does it."""
+    return [index.derive_codes(prefix, country) for prefix, country in row_inputs]
+
+
+def logging_rows(
+    rows: int, games: list[str], rng: random.Random
+) -> dict[int, dict[str, Any]]:
+    """Row values as RowModel.read_rows returns them, from LOG_START_ROW (3) down."""
+    return {
+        3 + i: {
+            "Code_Prefix": rng.choice(games),
+            "GAME": "Game",
+            "PACK": "100 Diamonds",
+            "code": None,
+            "country_code_priority": rng.choice([None, rng.choice(COUNTRY_CODES)]),
+            "LOWEST_PRICE": str(rng.randint(1000, 100000)),
+            "NOTE": None,
+            "LOG_CODE": None,
+            "LOG_COUNTRY": None,
+        }
+        for i in range(rows)
+    }
+
+
+def run(
+    products: int, rows: int, games: int, repeat: int, seed: int
+) -> dict[str, float]:
+    """Seconds per call of each benchmark (best of `repeat`)."""
+    rng = random.Random(seed)
+    prefixes = game_prefixes(games)
+    product_list = build_products(products, prefixes, rng)
+    catalog = ProductCatalog.from_products(product_list)
+    codes: list[str | None] = [p.code for p in product_list]
+    country_codes: list[str | None] = [p.country_code for p in product_list]
+    row_values = logging_rows(rows, prefixes, rng)
+    row_models = [
+        RowModel.model_validate(
+            {"sheet_id": "bench", "sheet_name": "Logging", "index": index, **values}
+        )
+        for index, values in row_values.items()
+    ]
+    row_inputs = [(m.Code_Prefix, m.country_code_priority) for m in row_models]
+
+    index = ListingCodeIndex(codes, country_codes)
+    by_code = {p.code: p for p in product_list}
+    row_products = [
+        [by_code[code] for code in index.derive_codes(prefix, country)]
+        for prefix, country in row_inputs
+    ]
+
+    mapping = InExKeywordMapping(
+        include_keywords={
+            "country_code": ["id", "sg", "my", "ph"],
+            "status": ["available"],
+        },
+        exclude_keywords={"name": ["Bundle"]},
+    )
+    matcher = keyword_matcher(mapping)
+
+    listing_models = [
+        ListingRowModel.model_validate(
+            {"sheet_id": "bench", "sheet_name": "Listing", "index": 4 + i, **p.model_dump()}
+        )
+        for i, p in enumerate(product_list[: rows * 4])
+    ]
+
+    other_products = product_list[:5]
+    now = datetime.now()
+
+    return {
+        "derive_codes_for_row": best_of(
+            lambda: [
+                derive_codes_for_row(prefix, country, codes, country_codes)
+                for prefix, country in row_inputs[:SCAN_ROWS]
+            ],
+            repeat,
+        ),
+        "ListingCodeIndex.derive_codes": best_of(
+            lambda: derive_all(ListingCodeIndex(codes, country_codes), row_inputs),
+            repeat,
+        ),
+        "is_valid_listing_product": best_of(
+            lambda: [
+                is_valid_listing_product(
+                    p, mapping.include_keywords, mapping.exclude_keywords
+                )
+                for p in product_list
+            ],
+            repeat,
+        ),
+        "ListingKeywordMatcher.mask": best_of(
+            lambda: matcher.mask(catalog.column, len(catalog), FIELDS), repeat
+        ),
+        "min_lapakgaming_products": best_of(
+            lambda: [
+                min_lapakgaming_products(model, matched)
+                for model, matched in zip(row_models, row_products)
+            ],
+            repeat,
+        ),
+        "RowModel.from_rows": best_of(
+            lambda: asyncio.run(
+                RowModel.from_rows("bench", "Logging", list(row_values), row_values)
+            ),
+            repeat,
+        ),
+        "RowModel.build_update_batch": best_of(
+            lambda: RowModel.build_update_batch("Logging", row_models), repeat
+        ),
+        "ListingRowModel.build_update_batch": best_of(
+            lambda: ListingRowModel.build_update_batch("Listing", listing_models),
+            repeat,
+        ),
+        "note_message": best_of(
+            lambda: [
+                note_message(now, matched[0] if matched else None, other_products)
+                for matched in row_products
+            ],
+            repeat,
+        ),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=20_000)
+    parser.add_argument("--rows", type=int, default=500, help="logging rows per call")
+    parser.add_argument("--games", type=int, default=200, help="distinct game prefixes")
+    parser.add_argument("--repeat", type=int, default=5, help="best-of repeats")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.products, args.rows, args.games, args.repeat, args.seed)
+    if args.json:
+        print(json.dumps(results))
+        return
+    for name, seconds in results.items():
+        print(f"{name:<36} {seconds * 1000:9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
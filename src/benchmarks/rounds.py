@@ -0,0 +1,55 @@
+"""
+Run full `process()` rounds and report their wall time and the process's peak RSS as JSON.
+
+Meant to be run by `benchmarks.suite` against the local fakes, one subprocess per scale,
+with the settings passed through the environment. It can also be pointed at fakes started
+by hand (see fakes/sheets_server.py and fakes/lapak_server.py):
+
+    PYTHONPATH=src uv run python -m benchmarks.rounds --rounds 3 --advance-url http://127.0.0.1:8098/_fake/advance
+"""
+
+import argparse
+import asyncio
+import json
+import resource
+import sys
+import time
+
+import httpx
+
+from app import config
+from app.processes import process
+
+
+async def run_rounds(rounds: int, advance_url: str | None) -> list[float]:
+    """Wall time of each round; the catalog simulator churns before every round but the first."""
+    round_seconds = []
+    async with httpx.AsyncClient(timeout=60.0) as client:
+        for i in range(rounds):
+            if i and advance_url:
+                (await client.post(advance_url)).raise_for_status()
+            start = time.perf_counter()
+            await process()
+            round_seconds.append(time.perf_counter() - start)
+    return round_seconds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument(
+        "--advance-url", default=None, help="POSTed before each round to churn the catalog"
+    )
+    args = parser.parse_args()
+
+    config.RELAX_AFTER_EACH_ROUND = 0
+    round_seconds = asyncio.run(run_rounds(args.rounds, args.advance_url))
+
+    # ru_maxrss is in KiB on Linux, bytes on macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_rss_mb = max_rss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    print(json.dumps({"round_seconds": round_seconds, "peak_rss_mb": peak_rss_mb}))
+
+
+if __name__ == "__main__":
+    main()
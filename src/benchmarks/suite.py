@@ -0,0 +1,336 @@
+"""
+Benchmark suite: end-to-end rounds at several scales plus the hot-path micro-benchmarks,
+compared against a JSON baseline.
+
+Every scale (listing sheets x logging sheets x logging rows x catalog size) gets its own
+fake Sheets server and Lapakgaming simulator (src/fakes) and runs `benchmarks.rounds` in
+a fresh subprocess, so peak RSS is measured per scale. Recorded per scale: round wall
+times, Sheets requests, bytes sent to Sheets, bytes received from Lapakgaming and peak
+RSS. The run fails (exit code 1) when a metric is worse than the baseline by more than
+--threshold; the first run, or --update-baseline, records the baseline instead.
+
+    PYTHONPATH=src uv run python -m benchmarks.suite
+    PYTHONPATH=src uv run python -m benchmarks.suite --scales small medium large --rounds 3
+    PYTHONPATH=src uv run python -m benchmarks.suite --env LISTING_SYNC_MODE=diff --update-baseline
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from statistics import mean
+from typing import Any, Final
+
+import yaml
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from pydantic import BaseModel
+
+from fakes.generate_fixtures import generate
+from fakes.lapak_server import LapakSimulator
+from fakes.sheets_server import API_PREFIX, TOKEN_PATH, FakeSheetsServer
+
+SRC_PATH: Final[Path] = Path(__file__).resolve().parent.parent
+DEFAULT_BASELINE_PATH: Final[Path] = Path(__file__).resolve().with_name("baseline.json")
+KEY_COUNT: Final[int] = 3
+
+# settings.env values for the benchmark subprocesses; client-side pacing is off so the
+# rounds are bound by the worker itself rather than by the per-minute quota
+BENCH_SETTINGS: Final[dict[str, str]] = {
+    "LAPAK_API_KEY": "bench",
+    "PROCESS_BATCH_SIZE": "50",
+    "PARALLEL_BATCH_COUNT": "4",
+    "LISTING_BATCH_SIZE": "50",
+    "LISTING_PARALLEL_BATCH_COUNT": "4",
+    "RATE_LIMIT_WAIT_SECONDS": "1",
+    "RELAX_AFTER_EACH_ROUND": "0",
+    "SHEETS_READ_REQUESTS_PER_MINUTE": "0",
+    "SHEETS_WRITE_REQUESTS_PER_MINUTE": "0",
+}
+
+# Metrics compared against the baseline; for all of them, higher is worse
+ROUND_METRICS: Final[tuple[str, ...]] = (
+    "first_round_seconds",
+    "steady_round_seconds",
+    "sheets_requests",
+    "sheets_bytes_sent",
+    "peak_rss_mb",
+)
+
+
+class Scale(BaseModel):
+    listing_sheets: int
+    logging_sheets: int
+    logging_rows: int  # Per logging sheet
+    products: int  # Across all countries
+    games: int = 200
+
+
+SCALES: Final[dict[str, Scale]] = {
+    "small": Scale(
+        listing_sheets=1, logging_sheets=1, logging_rows=200, products=20_000
+    ),
+    "medium": Scale(
+        listing_sheets=2, logging_sheets=2, logging_rows=1_000, products=100_000
+    ),
+    "large": Scale(
+        listing_sheets=4, logging_sheets=4, logging_rows=3_000, products=500_000
+    ),
+}
+
+
+def write_fake_keys(keys_dir: Path, count: int = KEY_COUNT) -> None:
+    """Service-account key files the fake token endpoint accepts (any RS256 signer will do)."""
+    keys_dir.mkdir(parents=True, exist_ok=True)
+    for i in range(count):
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        pem = private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        ).decode()
+        (keys_dir / f"bench-{i}.json").write_text(
+            json.dumps(
+                {
+                    "client_email": f"bench-{i}@bench.iam.gserviceaccount.com",
+                    "private_key": pem,
+                }
+            ),
+            encoding="utf-8",
+        )
+
+
+def subprocess_env(
+    keys_dir: Path, sheets_config_path: Path, overrides: dict[str, str]
+) -> dict[str, str]:
+    return {
+        **os.environ,
+        **BENCH_SETTINGS,
+        "PYTHONPATH": str(SRC_PATH),
+        "KEYS_FOLDER_PATH": str(keys_dir),
+        "SHEETS_CONFIG_PATH": str(sheets_config_path),
+        **overrides,
+    }
+
+
+def run_json(
+    args: list[str], env: dict[str, str], cwd: Path, verbose: bool, timeout: float
+) -> dict[str, Any]:
+    """Run `python -m <args>` and parse the JSON on the last line of its stdout."""
+    result = subprocess.run(
+        [sys.executable, "-m", *args],
+        cwd=cwd,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=None if verbose else subprocess.DEVNULL,
+        text=True,
+        timeout=timeout,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{' '.join(args)} exited with code {result.returncode}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def bench_scale(
+    name: str,
+    scale: Scale,
+    work_dir: Path,
+    keys_dir: Path,
+    args: argparse.Namespace,
+    overrides: dict[str, str],
+) -> dict[str, Any]:
+    scale_dir = work_dir / name
+    scale_dir.mkdir()
+    seed, sheets_config = generate(
+        scale.listing_sheets,
+        scale.logging_sheets,
+        scale.logging_rows,
+        scale.games,
+        0.3,
+        random.Random(0),
+    )
+    sheets_config_path = scale_dir / "sheets_config.yaml"
+    sheets_config_path.write_text(yaml.safe_dump(sheets_config), encoding="utf-8")
+
+    lapak = LapakSimulator(("127.0.0.1", 0), products=scale.products, games=scale.games)
+    sheets = FakeSheetsServer(("127.0.0.1", 0), latency=args.sheets_latency)
+    sheets.store.seed(seed)
+    lapak.serve_in_background()
+    sheets.serve_in_background()
+    try:
+        env = subprocess_env(
+            keys_dir,
+            sheets_config_path,
+            {
+                "SHEETS_BASE_URL": f"{sheets.base_url}{API_PREFIX.rstrip('/')}",
+                "GOOGLE_TOKEN_URL": f"{sheets.base_url}{TOKEN_PATH}",
+                "LAPAKGAMING_BASE_URL": lapak.base_url,
+                **overrides,
+            },
+        )
+        worker = run_json(
+            [
+                "benchmarks.rounds",
+                "--rounds",
+                str(args.rounds),
+                "--advance-url",
+                f"{lapak.base_url}/_fake/advance",
+            ],
+            env,
+            scale_dir,
+            args.verbose,
+            args.timeout,
+        )
+        sheets_stats = sheets.stats()
+        lapak_stats = lapak.stats()
+    finally:
+        lapak.shutdown()
+        sheets.shutdown()
+        lapak.server_close()
+        sheets.server_close()
+
+    requests = {k: v for k, v in sheets_stats["requests"].items() if k != "token"}
+    round_seconds = worker["round_seconds"]
+    return {
+        "first_round_seconds": round_seconds[0],
+        "steady_round_seconds": mean(round_seconds[1:] or round_seconds),
+        "sheets_requests": sum(requests.values()),
+        "sheets_bytes_sent": sheets_stats["bytes_in"],
+        "peak_rss_mb": worker["peak_rss_mb"],
+        # Recorded for reference, not compared
+        "round_seconds": round_seconds,
+        "sheets_requests_by_endpoint": requests,
+        "sheets_throttled": sum(sheets_stats["throttled"].values()),
+        "lapak_bytes_received": sum(lapak_stats["bytes_out"].values()),
+    }
+
+
+def compare(
+    baseline: dict[str, Any], current: dict[str, Any], threshold: float
+) -> list[str]:
+    """Print current vs baseline for every compared metric; return the regressions."""
+    regressions = []
+    for key, metrics in current.items():
+        compared = ROUND_METRICS if key.startswith("round/") else ("seconds",)
+        for metric in compared:
+            value = metrics[metric]
+            base = baseline.get(key, {}).get(metric)
+            if base is None:
+                print(f"{key:<48} {metric:<22} {'-':>12} {value:>12.4g}   (new)")
+                continue
+            change = (value - base) / base if base else 0.0
+            regressed = change > threshold
+            print(
+                f"{key:<48} {metric:<22} {base:>12.4g} {value:>12.4g} {change:+8.1%}"
+                + ("   REGRESSION" if regressed else "")
+            )
+            if regressed:
+                regressions.append(
+                    f"{key} {metric}: {base:.4g} -> {value:.4g} ({change:+.1%})"
+                )
+    return regressions
+
+
+def _overrides(pairs: list[str]) -> dict[str, str]:
+    overrides = {}
+    for pair in pairs:
+        name, sep, value = pair.partition("=")
+        if not sep:
+            raise SystemExit(f"--env expects NAME=VALUE, got '{pair}'")
+        overrides[name] = value
+    return overrides
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--scales", nargs="+", choices=list(SCALES), default=["small", "medium"]
+    )
+    parser.add_argument("--rounds", type=int, default=3, help="rounds per scale")
+    parser.add_argument("--skip-micro", action="store_true")
+    parser.add_argument(
+        "--sheets-latency", type=float, default=0.0, help="fake Sheets latency (s)"
+    )
+    parser.add_argument(
+        "--env",
+        action="append",
+        default=[],
+        metavar="NAME=VALUE",
+        help="extra setting for the benchmarked worker (repeatable)",
+    )
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE_PATH)
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="allowed slowdown (0.2 = 20%%)"
+    )
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--timeout", type=float, default=1800, help="per subprocess (s)")
+    parser.add_argument("--verbose", action="store_true", help="show worker logs")
+    args = parser.parse_args()
+    overrides = _overrides(args.env)
+
+    current: dict[str, Any] = {}
+    with tempfile.TemporaryDirectory(prefix="lpk-bench-") as tmp:
+        work_dir = Path(tmp)
+        keys_dir = work_dir / "keys"
+        write_fake_keys(keys_dir)
+
+        for name in args.scales:
+            start = time.perf_counter()
+            current[f"round/{name}"] = bench_scale(
+                name, SCALES[name], work_dir, keys_dir, args, overrides
+            )
+            print(
+                f"scale={name} done in {time.perf_counter() - start:.1f}s",
+                file=sys.stderr,
+            )
+
+        if not args.skip_micro:
+            # Any sheets config will do, hot_paths never talks to Sheets
+            sheets_config_path = work_dir / args.scales[0] / "sheets_config.yaml"
+            micro = run_json(
+                ["benchmarks.hot_paths", "--json"],
+                subprocess_env(keys_dir, sheets_config_path, overrides),
+                work_dir,
+                args.verbose,
+                args.timeout,
+            )
+            for name, seconds in micro.items():
+                current[f"micro/{name}"] = {"seconds": seconds}
+
+    baseline_doc = (
+        json.loads(args.baseline.read_text(encoding="utf-8"))
+        if args.baseline.exists()
+        else {"results": {}}
+    )
+    regressions = compare(baseline_doc["results"], current, args.threshold)
+
+    if args.update_baseline or not args.baseline.exists():
+        baseline_doc = {
+            "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "settings": overrides,
+            "results": {**baseline_doc["results"], **current},
+        }
+        args.baseline.write_text(
+            json.dumps(baseline_doc, indent=2) + "\n", encoding="utf-8"
+        )
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
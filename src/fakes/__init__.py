@@ -0,0 +1 @@
+"""In-process stand-ins for the external services the worker talks to (load testing only)."""
@@ -0,0 +1,151 @@
+"""
+Generate listing / logging sheet fixtures that match the Lapakgaming simulator's catalog.
+
+Writes two files into --out-dir:
+
+    sheets_seed.json     contents for `fakes.sheets_server --seed`
+    sheets_config.yaml   the matching sheets_config.yaml (listing + logging sheets)
+
+Listing sheets split the countries between them (row 2 includes their country codes and
+"available", row 3 excludes "Bundle" names); logging rows use the same game prefixes as
+`fakes.lapak_server --games`, so every row resolves against the simulated catalog.
+
+    PYTHONPATH=src uv run python -m fakes.generate_fixtures --out-dir fixtures
+    PYTHONPATH=src uv run python -m fakes.generate_fixtures --logging-sheets 4 --logging-rows 2000 --games 500
+"""
+
+import argparse
+import json
+import random
+from pathlib import Path
+from typing import Any, Final
+
+import yaml
+
+from .synthetic import COUNTRY_CODES, PACK_SIZES, game_prefixes
+
+LISTING_HEADER: Final[list[str]] = [
+    "CHECK",
+    "code",
+    "category_code",
+    "name",
+    "provider_code",
+    "price",
+    "process_time",
+    "country_code",
+    "status",
+    "Note",
+]
+LOGGING_HEADER: Final[list[str]] = [
+    "Code Prefix",
+    "",
+    "GAME",
+    "PACK",
+    "code",
+    "Country priority",
+    "LOWEST PRICE",
+    "NOTE",
+    "LOG CODE",
+    "LOG COUNTRY",
+]
+
+
+def listing_sheet_rows(country_codes: list[str]) -> list[list[Any]]:
+    """Header, include row (country codes + available) and exclude row (bundles)."""
+    include = [""] * len(LISTING_HEADER)
+    include[LISTING_HEADER.index("country_code")] = ",".join(country_codes)
+    include[LISTING_HEADER.index("status")] = "available"
+    exclude = [""] * len(LISTING_HEADER)
+    exclude[LISTING_HEADER.index("name")] = "Bundle"
+    return [LISTING_HEADER, include, exclude]
+
+
+def logging_sheet_rows(
+    rows: int, games: list[str], priority_rate: float, rng: random.Random
+) -> list[list[Any]]:
+    """Two header rows, then `rows` logging rows from LOG_START_ROW (3) down."""
+    sheet: list[list[Any]] = [LOGGING_HEADER, []]
+    for _ in range(rows):
+        game = rng.choice(games)
+        country = rng.choice(COUNTRY_CODES) if rng.random() < priority_rate else ""
+        sheet.append(
+            [game, "", f"Game {game}", f"{rng.choice(PACK_SIZES)} Diamonds", "", country]
+        )
+    return sheet
+
+
+def generate(
+    listing_sheets: int,
+    logging_sheets: int,
+    logging_rows: int,
+    games: int,
+    priority_rate: float,
+    rng: random.Random,
+) -> tuple[dict[str, dict[str, list[list[Any]]]], dict[str, Any]]:
+    """Return the sheets seed and the sheets_config.yaml contents."""
+    prefixes = game_prefixes(games)
+    seed: dict[str, dict[str, list[list[Any]]]] = {}
+    sheets_config: dict[str, Any] = {"listing_sheets": [], "logging_sheets": []}
+
+    for i in range(listing_sheets):
+        spreadsheet_id, name = f"fake-listing-{i}", f"Listing {i}"
+        countries = list(COUNTRY_CODES[i::listing_sheets])
+        seed[spreadsheet_id] = {name: listing_sheet_rows(countries)}
+        sheets_config["listing_sheets"].append(
+            {"name": name, "spreadsheet_id": spreadsheet_id}
+        )
+
+    for i in range(logging_sheets):
+        spreadsheet_id, name = f"fake-logging-{i}", f"Logging {i}"
+        seed[spreadsheet_id] = {
+            name: logging_sheet_rows(logging_rows, prefixes, priority_rate, rng)
+        }
+        sheets_config["logging_sheets"].append(
+            {"name": name, "spreadsheet_id": spreadsheet_id}
+        )
+
+    return seed, sheets_config
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1].strip())
+    parser.add_argument("--out-dir", default="fixtures")
+    parser.add_argument("--listing-sheets", type=int, default=2)
+    parser.add_argument("--logging-sheets", type=int, default=2)
+    parser.add_argument(
+        "--logging-rows", type=int, default=500, help="Rows per logging sheet"
+    )
+    parser.add_argument(
+        "--games", type=int, default=200, help="Same value as fakes.lapak_server --games"
+    )
+    parser.add_argument(
+        "--priority-rate",
+        type=float,
+        default=0.3,
+        help="Share of logging rows with a country priority",
+    )
+    parser.add_argument("--random-seed", type=int, default=0)
+    args = parser.parse_args()
+
+    seed, sheets_config = generate(
+        args.listing_sheets,
+        args.logging_sheets,
+        args.logging_rows,
+        args.games,
+        args.priority_rate,
+        random.Random(args.random_seed),
+    )
+    out_dir = Path(args.out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    (out_dir / "sheets_seed.json").write_text(json.dumps(seed), encoding="utf-8")
+    (out_dir / "sheets_config.yaml").write_text(
+        yaml.safe_dump(sheets_config, sort_keys=False), encoding="utf-8"
+    )
+    print(
+        f"Wrote {args.listing_sheets} listing and {args.logging_sheets} logging sheet(s) "
+        f"({args.logging_rows} rows each) to {out_dir}"
+    )
+
+
+if __name__ == "__main__":
+    main()
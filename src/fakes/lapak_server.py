@@ -0,0 +1,336 @@
+"""
+Local Lapakgaming catalog simulator serving synthetic products, for offline load tests.
+
+Serves `GET /api/all-products?country_code=xx` the way the real API does, from catalogs
+generated at startup (see fakes/synthetic.py). Each "round" of churn moves the price of
+`--price-churn` and flips the status of `--status-churn` of every country's products; a
+country whose catalog changed gets a new ETag, and If-None-Match on an unchanged one is
+answered with 304. Rounds run every `--round-seconds`, or on demand via the control API:
+
+    POST /_fake/advance        apply one round of churn now
+    GET  /_fake/stats          requests / 304s / failures / bytes per country
+    POST /_fake/stats/reset
+
+`--slow id=2.5` delays one country's responses and `--fail br=0.5` makes half of its
+requests fail with HTTP 500 (both repeatable). Point the worker at it with:
+
+    LAPAKGAMING_BASE_URL=http://127.0.0.1:8098
+
+and run it with:
+
+    PYTHONPATH=src uv run python -m fakes.lapak_server --products 100000
+    PYTHONPATH=src uv run python -m fakes.lapak_server --products 500000 --round-seconds 60 --slow id=3 --fail br=0.2
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Final
+from urllib.parse import parse_qs, urlsplit
+
+from .synthetic import (
+    COUNTRY_CODES,
+    churn,
+    game_prefixes,
+    generate_products,
+    product_record,
+    split_sizes,
+)
+
+PRODUCTS_PATH: Final[str] = "/api/all-products"
+WRITE_CHUNK_SIZE: Final[int] = 64 * 1024  # Let streaming clients see the body arrive
+
+
+class CountryCatalog:
+    """One country's products, plus the encoded response body of their current version."""
+
+    def __init__(self, country_code: str, products: list[list[Any]]) -> None:
+        self.country_code = country_code
+        self.products = products
+        self.version = 0
+        self._body: bytes | None = None
+        self._etag: str | None = None
+
+    def touch(self) -> None:
+        self.version += 1
+        self._body = None
+
+    def body(self) -> tuple[bytes, str]:
+        """Encoded response and its ETag, rebuilt only after the catalog changed."""
+        if self._body is None:
+            self._body = json.dumps(
+                {
+                    "code": "SUCCESS",
+                    "data": {"products": [product_record(p) for p in self.products]},
+                }
+            ).encode()
+            digest = hashlib.blake2b(self._body, digest_size=8).hexdigest()
+            self._etag = f'"{self.country_code}-{self.version}-{digest}"'
+        return self._body, self._etag  # type: ignore[return-value]
+
+
+class LapakSimulator(ThreadingHTTPServer):
+    """HTTP server holding the generated catalogs and the fault-injection settings."""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        products: int = 50_000,
+        games: int = 200,
+        country_codes: tuple[str, ...] = COUNTRY_CODES,
+        price_churn: float = 0.05,
+        status_churn: float = 0.01,
+        latency: float = 0.0,
+        slow: dict[str, float] | None = None,
+        fail: dict[str, float] | None = None,
+        random_seed: int | None = 0,
+    ) -> None:
+        super().__init__(address, LapakSimulatorHandler)
+        self.random = random.Random(random_seed)
+        self.price_churn = price_churn
+        self.status_churn = status_churn
+        self.latency = latency
+        self.slow = slow or {}
+        self.fail = fail or {}
+        self.lock = threading.Lock()
+        self.rounds = 0
+
+        prefixes = game_prefixes(games)
+        self.catalogs = {
+            cc: CountryCatalog(cc, generate_products(cc, size, prefixes, self.random))
+            for cc, size in split_sizes(products, country_codes).items()
+        }
+        self.reset_stats()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def reset_stats(self) -> None:
+        self.requests: Counter[str] = Counter()
+        self.not_modified: Counter[str] = Counter()
+        self.failures: Counter[str] = Counter()
+        self.bytes_out: Counter[str] = Counter()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "rounds": self.rounds,
+            "products": sum(len(c.products) for c in self.catalogs.values()),
+            "requests": dict(self.requests),
+            "not_modified": dict(self.not_modified),
+            "failures": dict(self.failures),
+            "bytes_out": dict(self.bytes_out),
+        }
+
+    def advance(self) -> dict[str, int]:
+        """Apply one round of churn to every country; returns changed products per country."""
+        with self.lock:
+            self.rounds += 1
+            changed = {}
+            for cc, catalog in self.catalogs.items():
+                changed[cc] = churn(
+                    catalog.products, self.price_churn, self.status_churn, self.random
+                )
+                if changed[cc]:
+                    catalog.touch()
+            return changed
+
+    def advance_every(self, seconds: float) -> threading.Thread:
+        def run() -> None:
+            while True:
+                time.sleep(seconds)
+                self.advance()
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
+
+    def serve_in_background(self) -> threading.Thread:
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+
+class LapakSimulatorHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: LapakSimulator
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass  # One line per request would dominate a load test's output
+
+    def _send(
+        self, code: int, body: bytes = b"", headers: dict[str, str] | None = None
+    ) -> None:
+        self.send_response(code)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        view = memoryview(body)
+        for start in range(0, len(body), WRITE_CHUNK_SIZE):
+            self.wfile.write(view[start : start + WRITE_CHUNK_SIZE])
+
+    def _send_json(self, code: int, body: Any) -> None:
+        self._send(
+            code, json.dumps(body).encode(), {"Content-Type": "application/json"}
+        )
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        if url.path == "/_fake/stats":
+            with self.server.lock:
+                stats = self.server.stats()
+            self._send_json(200, stats)
+        elif url.path == PRODUCTS_PATH:
+            country_code = parse_qs(url.query).get("country_code", ["id"])[0]
+            self._handle_products(country_code)
+        else:
+            self._send_json(404, {"code": "NOT_FOUND", "data": None})
+
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        url = urlsplit(self.path)
+        if url.path == "/_fake/advance":
+            self._send_json(200, {"changed": self.server.advance()})
+        elif url.path == "/_fake/stats/reset":
+            with self.server.lock:
+                self.server.reset_stats()
+            self._send_json(200, {})
+        else:
+            self._send_json(404, {"code": "NOT_FOUND", "data": None})
+
+    def _handle_products(self, country_code: str) -> None:
+        server = self.server
+        if not self.headers.get("Authorization", "").startswith("Bearer "):
+            self._send_json(401, {"code": "UNAUTHORIZED", "data": None})
+            return
+
+        delay = server.latency + server.slow.get(country_code, 0.0)
+        if delay > 0:
+            time.sleep(delay)
+
+        with server.lock:
+            server.requests[country_code] += 1
+            if server.random.random() < server.fail.get(country_code, 0.0):
+                server.failures[country_code] += 1
+                failed = True
+            else:
+                failed = False
+                catalog = server.catalogs.get(country_code)
+                if catalog is None:
+                    catalog = server.catalogs[country_code] = CountryCatalog(
+                        country_code, []
+                    )
+                body, etag = catalog.body()
+                not_modified = self.headers.get("If-None-Match") == etag
+                if not_modified:
+                    server.not_modified[country_code] += 1
+                else:
+                    server.bytes_out[country_code] += len(body)
+
+        if failed:
+            self._send_json(500, {"code": "INTERNAL_SERVER_ERROR", "data": None})
+        elif not_modified:
+            self._send(304, headers={"ETag": etag})
+        else:
+            self._send(200, body, {"Content-Type": "application/json", "ETag": etag})
+
+
+def _country_values(pairs: list[str], option: str) -> dict[str, float]:
+    values = {}
+    for pair in pairs:
+        country_code, sep, value = pair.partition("=")
+        if not sep:
+            raise SystemExit(f"{option} expects country=value, got '{pair}'")
+        values[country_code.strip().lower()] = float(value)
+    return values
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8098)
+    parser.add_argument(
+        "--products", type=int, default=50_000, help="Products across all countries"
+    )
+    parser.add_argument("--games", type=int, default=200, help="Distinct game prefixes")
+    parser.add_argument(
+        "--price-churn",
+        type=float,
+        default=0.05,
+        help="Share of prices moved per round",
+    )
+    parser.add_argument(
+        "--status-churn",
+        type=float,
+        default=0.01,
+        help="Share of statuses flipped per round",
+    )
+    parser.add_argument(
+        "--round-seconds",
+        type=float,
+        default=0.0,
+        help="Churn interval (0 = only on /_fake/advance)",
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.0,
+        help="Seconds added to every product request",
+    )
+    parser.add_argument(
+        "--slow",
+        action="append",
+        default=[],
+        metavar="CC=SECONDS",
+        help="Extra delay for one country",
+    )
+    parser.add_argument(
+        "--fail",
+        action="append",
+        default=[],
+        metavar="CC=RATE",
+        help="HTTP 500 probability for one country",
+    )
+    parser.add_argument("--random-seed", type=int, default=0)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    server = LapakSimulator(
+        (args.host, args.port),
+        products=args.products,
+        games=args.games,
+        price_churn=args.price_churn,
+        status_churn=args.status_churn,
+        latency=args.latency,
+        slow=_country_values(args.slow, "--slow"),
+        fail=_country_values(args.fail, "--fail"),
+        random_seed=args.random_seed,
+    )
+    print(
+        f"Generated {args.products} products for {len(server.catalogs)} countries "
+        f"in {time.perf_counter() - started:.1f}s"
+    )
+    if args.round_seconds > 0:
+        server.advance_every(args.round_seconds)
+
+    print(f"Lapakgaming simulator listening on {server.base_url}")
+    print(f"  LAPAKGAMING_BASE_URL={server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,611 @@
+"""
+Fake Google Sheets API + OAuth2 token endpoint, kept in memory, for offline load tests.
+
+Implements the subset of the API that src/app/sheet uses:
+
+    GET  /v4/spreadsheets/{id}                        sheet properties (title, sheetId)
+    GET  /v4/spreadsheets/{id}/values/{range}         single range, honours majorDimension
+    GET  /v4/spreadsheets/{id}/values:batchGet
+    POST /v4/spreadsheets/{id}/values:batchUpdate
+    POST /v4/spreadsheets/{id}/values:batchClear
+    POST /v4/spreadsheets/{id}:batchUpdate            updateCells / repeatCell only
+    POST /token                                       accepts any service-account JWT
+
+plus a few control endpoints for the harness:
+
+    GET  /_fake/stats                  request / byte / 429 counters
+    POST /_fake/stats/reset
+    POST /_fake/seed                   {spreadsheet_id: {sheet_name: [[row values], ...]}}
+    GET  /_fake/dump/{id}              every sheet of a spreadsheet as row lists
+
+Spreadsheets and sheets are created on first use. Every API request sleeps for
+`--latency` (+ up to `--jitter`) seconds; per access token, reads and writes beyond
+`--quota-per-minute` in a sliding minute get HTTP 429, and `--error-rate` injects 429s at
+random on top of that. `--throttle sa-1@project.iam.gserviceaccount.com=0.5` answers half
+of the requests of one service-account key (by the JWT's client_email) with 429
+(repeatable).
+
+Point the worker at it through settings.env:
+
+    SHEETS_BASE_URL=http://127.0.0.1:8099/v4/spreadsheets
+    GOOGLE_TOKEN_URL=http://127.0.0.1:8099/token
+
+and run it with:
+
+    PYTHONPATH=src uv run python -m fakes.sheets_server --port 8099
+    PYTHONPATH=src uv run python -m fakes.sheets_server --latency 0.2 --quota-per-minute 60 --seed seed.json
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Final
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import jwt  # PyJWT
+from gspread.utils import a1_range_to_grid_range
+
+API_PREFIX: Final[str] = "/v4/spreadsheets/"
+TOKEN_PATH: Final[str] = "/token"
+# What USER_ENTERED input turns into a number (enough for prices and process times)
+NUMBER_PATTERN: Final[re.Pattern] = re.compile(r"^-?\d+(\.\d+)?$")
+
+
+class FakeApiError(Exception):
+    def __init__(self, code: int, status: str, message: str) -> None:
+        super().__init__(message)
+        self.code = code
+        self.status = status
+        self.message = message
+
+
+def split_a1_range(a1_range: str) -> tuple[str, str]:
+    """Split "'My sheet'!B4:J8" into the sheet name and the cell range ("" = whole sheet)."""
+    if "!" not in a1_range:
+        sheet_name, cells = a1_range, ""
+    else:
+        sheet_name, _, cells = a1_range.rpartition("!")
+    if len(sheet_name) >= 2 and sheet_name[0] == sheet_name[-1] == "'":
+        sheet_name = sheet_name[1:-1].replace("''", "'")
+    return sheet_name, cells
+
+
+def _user_entered(value: Any) -> Any:
+    if isinstance(value, str) and NUMBER_PATTERN.match(value):
+        return float(value) if "." in value else int(value)
+    return value
+
+
+def _formatted(value: Any) -> Any:
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _cell_value(cell: dict[str, Any]) -> Any:
+    """Value of a CellData under the userEnteredValue mask ("" = cleared)."""
+    entered = cell.get("userEnteredValue") or {}
+    for kind in ("numberValue", "stringValue", "boolValue", "formulaValue"):
+        if kind in entered:
+            return entered[kind]
+    return ""
+
+
+class Sheet:
+    """One tab: a dense grid of cell values, "" for empty cells."""
+
+    def __init__(self, sheet_id: int, title: str) -> None:
+        self.sheet_id = sheet_id
+        self.title = title
+        self.rows: list[list[Any]] = []
+
+    def set(self, row: int, col: int, value: Any) -> None:
+        if row >= len(self.rows):
+            if value == "":
+                return
+            self.rows.extend([] for _ in range(row + 1 - len(self.rows)))
+        cells = self.rows[row]
+        if col >= len(cells):
+            if value == "":
+                return
+            cells.extend("" for _ in range(col + 1 - len(cells)))
+        cells[col] = value
+
+    def write(self, row: int, col: int, values: list[list[Any]]) -> None:
+        for row_offset, row_values in enumerate(values):
+            for col_offset, value in enumerate(row_values):
+                if value is not None:  # None leaves the cell untouched
+                    self.set(row + row_offset, col + col_offset, value)
+
+    def clear(self, grid_range: dict[str, int]) -> None:
+        start_row = grid_range.get("startRowIndex", 0)
+        end_row = min(grid_range.get("endRowIndex", len(self.rows)), len(self.rows))
+        start_col = grid_range.get("startColumnIndex", 0)
+        for row in range(start_row, end_row):
+            cells = self.rows[row]
+            end_col = min(grid_range.get("endColumnIndex", len(cells)), len(cells))
+            for col in range(start_col, end_col):
+                cells[col] = ""
+
+    def read(
+        self, grid_range: dict[str, int], major_dimension: str, formatted: bool
+    ) -> list[list[Any]]:
+        """Values in `grid_range`, trimmed of trailing empty cells and rows like the API."""
+        start_row = grid_range.get("startRowIndex", 0)
+        end_row = min(grid_range.get("endRowIndex", len(self.rows)), len(self.rows))
+        start_col = grid_range.get("startColumnIndex", 0)
+        end_col = grid_range.get("endColumnIndex")
+        block = [
+            [
+                _formatted(value) if formatted and value != "" else value
+                for value in self.rows[row][start_col:end_col]
+            ]
+            for row in range(start_row, end_row)
+        ]
+        if major_dimension == "COLUMNS":
+            width = max((len(row) for row in block), default=0)
+            block = [
+                [row[col] if col < len(row) else "" for row in block]
+                for col in range(width)
+            ]
+        for line in block:
+            while line and line[-1] == "":
+                line.pop()
+        while block and not block[-1]:
+            block.pop()
+        return block
+
+
+class FakeSheetsStore:
+    """Spreadsheets by id, each a dict of Sheet by title. Not thread-safe on its own."""
+
+    def __init__(self) -> None:
+        self.spreadsheets: dict[str, dict[str, Sheet]] = {}
+
+    def sheets(self, spreadsheet_id: str) -> dict[str, Sheet]:
+        return self.spreadsheets.setdefault(spreadsheet_id, {})
+
+    def sheet(self, spreadsheet_id: str, title: str) -> Sheet:
+        sheets = self.sheets(spreadsheet_id)
+        if title not in sheets:
+            sheets[title] = Sheet(len(sheets), title)
+        return sheets[title]
+
+    def sheet_by_id(self, spreadsheet_id: str, sheet_id: int) -> Sheet:
+        for sheet in self.sheets(spreadsheet_id).values():
+            if sheet.sheet_id == sheet_id:
+                return sheet
+        raise FakeApiError(400, "INVALID_ARGUMENT", f"No grid with id: {sheet_id}")
+
+    def resolve(self, spreadsheet_id: str, a1_range: str) -> tuple[Sheet, dict[str, int]]:
+        title, cells = split_a1_range(a1_range)
+        try:
+            grid_range = a1_range_to_grid_range(cells) if cells else {}
+        except Exception:
+            raise FakeApiError(
+                400, "INVALID_ARGUMENT", f"Unable to parse range: {a1_range}"
+            )
+        return self.sheet(spreadsheet_id, title), grid_range
+
+    def seed(self, data: dict[str, dict[str, list[list[Any]]]]) -> None:
+        for spreadsheet_id, sheets in data.items():
+            for title, rows in sheets.items():
+                sheet = self.sheet(spreadsheet_id, title)
+                sheet.rows = []
+                sheet.write(0, 0, rows)
+
+    def dump(self, spreadsheet_id: str) -> dict[str, list[list[Any]]]:
+        return {
+            title: [list(row) for row in sheet.rows]
+            for title, sheet in self.sheets(spreadsheet_id).items()
+        }
+
+
+class FakeSheetsServer(ThreadingHTTPServer):
+    """HTTP server holding the fake's state; handlers run one thread per connection."""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        quota_per_minute: int = 0,
+        error_rate: float = 0.0,
+        throttle: dict[str, float] | None = None,
+        random_seed: int | None = None,
+    ) -> None:
+        super().__init__(address, FakeSheetsHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.quota_per_minute = quota_per_minute
+        self.error_rate = error_rate
+        self.throttle = throttle or {}  # client_email -> 429 probability
+        # Access token -> client_email of the key it was issued to
+        self.token_emails: dict[str, str] = {}
+        self.random = random.Random(random_seed)
+        self.store = FakeSheetsStore()
+        self.lock = threading.Lock()
+        # (access token, "read" | "write") -> send times within the last minute
+        self._windows: dict[tuple[str, str], deque[float]] = defaultdict(deque)
+        self.reset_stats()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def reset_stats(self) -> None:
+        self.requests: Counter[str] = Counter()
+        self.throttled: Counter[str] = Counter()
+        self.requests_by_key: Counter[str] = Counter()
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "requests": dict(self.requests),
+            "throttled": dict(self.throttled),
+            "requests_by_key": dict(self.requests_by_key),
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+        }
+
+    def admit(self, token: str, kind: str) -> bool:
+        """Count a request against the token's per-minute quota; False means 429."""
+        if self.error_rate and self.random.random() < self.error_rate:
+            return False
+        key_rate = self.throttle.get(self.token_emails.get(token, ""), 0.0)
+        if key_rate and self.random.random() < key_rate:
+            return False
+        if not self.quota_per_minute:
+            return True
+        now = time.monotonic()
+        window = self._windows[(token, kind)]
+        while window and window[0] <= now - 60:
+            window.popleft()
+        if len(window) >= self.quota_per_minute:
+            return False
+        window.append(now)
+        return True
+
+    def serve_in_background(self) -> threading.Thread:
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+
+class FakeSheetsHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+    server: FakeSheetsServer
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass  # One line per request would dominate a load test's output
+
+    def _send_json(self, code: int, body: Any) -> None:
+        payload = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json; charset=UTF-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+        with self.server.lock:
+            self.server.bytes_out += len(payload)
+
+    def _send_error(self, error: FakeApiError) -> None:
+        self._send_json(
+            error.code,
+            {
+                "error": {
+                    "code": error.code,
+                    "message": error.message,
+                    "status": error.status,
+                }
+            },
+        )
+
+    def _read_body(self) -> bytes:
+        """The request body, read from the connection on first use."""
+        if self._body is None:
+            self._body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            with self.server.lock:
+                self.server.bytes_in += len(self._body)
+        return self._body
+
+    def _read_json(self) -> Any:
+        body = self._read_body()
+        try:
+            return json.loads(body or b"{}")
+        except json.JSONDecodeError:
+            raise FakeApiError(400, "INVALID_ARGUMENT", "Invalid JSON payload")
+
+    def do_GET(self) -> None:
+        self._dispatch("GET")
+
+    def do_POST(self) -> None:
+        self._dispatch("POST")
+
+    def _dispatch(self, method: str) -> None:
+        self._body: bytes | None = None
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        try:
+            if url.path.startswith("/_fake/"):
+                self._handle_control(method, url.path)
+            elif url.path == TOKEN_PATH and method == "POST":
+                self._handle_token()
+            elif url.path.startswith(API_PREFIX):
+                self._handle_api(method, unquote(url.path[len(API_PREFIX) :]), query)
+            else:
+                raise FakeApiError(404, "NOT_FOUND", f"{method} {url.path}")
+        except FakeApiError as e:
+            if method == "POST":
+                # An unread body would be parsed as the next request on this connection
+                self._read_body()
+            self._send_error(e)
+
+    def _handle_control(self, method: str, path: str) -> None:
+        server = self.server
+        if method == "GET" and path == "/_fake/stats":
+            with server.lock:
+                stats = server.stats()
+            self._send_json(200, stats)
+        elif method == "POST" and path == "/_fake/stats/reset":
+            with server.lock:
+                server.reset_stats()
+            self._send_json(200, {})
+        elif method == "POST" and path == "/_fake/seed":
+            data = json.loads(self._read_body())
+            with server.lock:
+                server.store.seed(data)
+            self._send_json(200, {})
+        elif method == "GET" and path.startswith("/_fake/dump/"):
+            with server.lock:
+                dump = server.store.dump(unquote(path[len("/_fake/dump/") :]))
+            self._send_json(200, dump)
+        else:
+            raise FakeApiError(404, "NOT_FOUND", f"{method} {path}")
+
+    def _handle_token(self) -> None:
+        form = parse_qs(self._read_body().decode())
+        try:
+            claims = jwt.decode(
+                form["assertion"][0], options={"verify_signature": False}
+            )
+        except (KeyError, jwt.PyJWTError):
+            raise FakeApiError(400, "INVALID_ARGUMENT", "invalid_grant")
+        client_email = claims.get("iss", "anonymous")
+        access_token = f"fake-{client_email}"
+        with self.server.lock:
+            self.server.requests["token"] += 1
+            self.server.token_emails[access_token] = client_email
+        self._send_json(
+            200,
+            {
+                "access_token": access_token,
+                "expires_in": 3600,
+                "token_type": "Bearer",
+            },
+        )
+
+    def _handle_api(self, method: str, path: str, query: dict[str, list[str]]) -> None:
+        spreadsheet_id, sep, rest = path.partition("/")
+        if not sep:
+            spreadsheet_id, _, rest = path.partition(":")
+            rest = f":{rest}" if rest else ""
+
+        if method == "GET" and rest == "":
+            endpoint, kind = "get", "read"
+        elif method == "GET" and rest == "values:batchGet":
+            endpoint, kind = "values:batchGet", "read"
+        elif method == "GET" and rest.startswith("values/"):
+            endpoint, kind = "values:get", "read"
+        elif method == "POST" and rest == "values:batchUpdate":
+            endpoint, kind = "values:batchUpdate", "write"
+        elif method == "POST" and rest == "values:batchClear":
+            endpoint, kind = "values:batchClear", "write"
+        elif method == "POST" and rest == ":batchUpdate":
+            endpoint, kind = "batchUpdate", "write"
+        else:
+            raise FakeApiError(404, "NOT_FOUND", f"{method} {path}")
+
+        token = self.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+        if not token:
+            raise FakeApiError(401, "UNAUTHENTICATED", "Missing access token")
+        body = self._read_json() if method == "POST" else None
+
+        server = self.server
+        delay = server.latency + server.random.uniform(0, server.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+        with server.lock:
+            server.requests_by_key[token] += 1
+            if not server.admit(token, kind):
+                server.throttled[endpoint] += 1
+                raise FakeApiError(
+                    429,
+                    "RESOURCE_EXHAUSTED",
+                    f"Quota exceeded for quota metric '{kind.title()} requests'",
+                )
+            server.requests[endpoint] += 1
+            response = self._apply(endpoint, spreadsheet_id, rest, query, body)
+        self._send_json(200, response)
+
+    def _apply(
+        self,
+        endpoint: str,
+        spreadsheet_id: str,
+        rest: str,
+        query: dict[str, list[str]],
+        body: Any,
+    ) -> dict[str, Any]:
+        store = self.server.store
+        formatted = query.get("valueRenderOption", ["FORMATTED_VALUE"])[0] == (
+            "FORMATTED_VALUE"
+        )
+        major_dimension = query.get("majorDimension", ["ROWS"])[0]
+
+        def value_range(a1_range: str) -> dict[str, Any]:
+            sheet, grid_range = store.resolve(spreadsheet_id, a1_range)
+            values = sheet.read(grid_range, major_dimension, formatted)
+            result: dict[str, Any] = {"range": a1_range, "majorDimension": major_dimension}
+            if values:
+                result["values"] = values
+            return result
+
+        if endpoint == "get":
+            return {
+                "spreadsheetId": spreadsheet_id,
+                "sheets": [
+                    {"properties": {"sheetId": sheet.sheet_id, "title": sheet.title}}
+                    for sheet in store.sheets(spreadsheet_id).values()
+                ],
+            }
+
+        if endpoint == "values:get":
+            return value_range(rest[len("values/") :])
+
+        if endpoint == "values:batchGet":
+            return {
+                "spreadsheetId": spreadsheet_id,
+                "valueRanges": [value_range(r) for r in query.get("ranges", [])],
+            }
+
+        if endpoint == "values:batchUpdate":
+            user_entered = body.get("valueInputOption") == "USER_ENTERED"
+            updated_cells = 0
+            for data in body.get("data", []):
+                sheet, grid_range = store.resolve(spreadsheet_id, data["range"])
+                values = data.get("values", [])
+                if user_entered:
+                    values = [[_user_entered(v) for v in row] for row in values]
+                sheet.write(
+                    grid_range.get("startRowIndex", 0),
+                    grid_range.get("startColumnIndex", 0),
+                    values,
+                )
+                updated_cells += sum(v is not None for row in values for v in row)
+            return {"spreadsheetId": spreadsheet_id, "totalUpdatedCells": updated_cells}
+
+        if endpoint == "values:batchClear":
+            ranges = body.get("ranges", [])
+            for a1_range in ranges:
+                sheet, grid_range = store.resolve(spreadsheet_id, a1_range)
+                sheet.clear(grid_range)
+            return {"spreadsheetId": spreadsheet_id, "clearedRanges": ranges}
+
+        # spreadsheets:batchUpdate
+        replies: list[dict[str, Any]] = []
+        for request in body.get("requests", []):
+            if "updateCells" in request:
+                update = request["updateCells"]
+                start = update["start"]
+                sheet = store.sheet_by_id(spreadsheet_id, start.get("sheetId", 0))
+                sheet.write(
+                    start.get("rowIndex", 0),
+                    start.get("columnIndex", 0),
+                    [
+                        [_cell_value(cell) for cell in row.get("values", [])]
+                        for row in update.get("rows", [])
+                    ],
+                )
+            elif "repeatCell" in request:
+                repeat = request["repeatCell"]
+                grid_range = repeat["range"]
+                sheet = store.sheet_by_id(spreadsheet_id, grid_range.get("sheetId", 0))
+                value = _cell_value(repeat.get("cell", {}))
+                if value == "":
+                    sheet.clear(grid_range)
+                else:
+                    end_row = grid_range.get("endRowIndex", len(sheet.rows))
+                    end_col = grid_range["endColumnIndex"]
+                    for row in range(grid_range.get("startRowIndex", 0), end_row):
+                        for col in range(grid_range.get("startColumnIndex", 0), end_col):
+                            sheet.set(row, col, value)
+            else:
+                raise FakeApiError(
+                    400,
+                    "INVALID_ARGUMENT",
+                    f"Unsupported request: {', '.join(request)}",
+                )
+            replies.append({})
+        return {"spreadsheetId": spreadsheet_id, "replies": replies}
+
+
+def _key_values(pairs: list[str], option: str) -> dict[str, float]:
+    values = {}
+    for pair in pairs:
+        client_email, sep, value = pair.rpartition("=")
+        if not sep:
+            raise SystemExit(f"{option} expects key_email=value, got '{pair}'")
+        values[client_email.strip()] = float(value)
+    return values
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Seconds added to every API request"
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=0.0, help="Extra random latency, up to this many seconds"
+    )
+    parser.add_argument(
+        "--quota-per-minute",
+        type=int,
+        default=0,
+        help="Read and write requests each access token may send per minute (0 = unlimited)",
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="Probability of a random HTTP 429"
+    )
+    parser.add_argument(
+        "--throttle",
+        action="append",
+        default=[],
+        metavar="KEY_EMAIL=RATE",
+        help="HTTP 429 probability for one service-account key (its client_email)",
+    )
+    parser.add_argument("--random-seed", type=int, default=None)
+    parser.add_argument(
+        "--seed", default=None, help="JSON file of {spreadsheet_id: {sheet: [[row], ...]}}"
+    )
+    args = parser.parse_args()
+
+    server = FakeSheetsServer(
+        (args.host, args.port),
+        latency=args.latency,
+        jitter=args.jitter,
+        quota_per_minute=args.quota_per_minute,
+        error_rate=args.error_rate,
+        throttle=_key_values(args.throttle, "--throttle"),
+        random_seed=args.random_seed,
+    )
+    if args.seed:
+        with open(args.seed, encoding="utf-8") as f:
+            server.store.seed(json.load(f))
+
+    print(f"Fake Google Sheets listening on {server.base_url}")
+    print(f"  SHEETS_BASE_URL={server.base_url}{API_PREFIX.rstrip('/')}")
+    print(f"  GOOGLE_TOKEN_URL={server.base_url}{TOKEN_PATH}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
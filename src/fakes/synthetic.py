@@ -0,0 +1,92 @@
+"""Synthetic Lapakgaming products, shared by the catalog simulator and the fixture generator.
+
+Codes look like "G012-ID-000345": every product of game G012 matches a logging row whose
+Code_Prefix is "G012", the same way real codes share their game's prefix.
+"""
+
+import random
+from typing import Any, Final, Sequence
+
+# app.lapakgaming.consts.COUNTRY_CODES, repeated so fakes never import `app` (which
+# needs settings.env and sheets_config.yaml at import time)
+COUNTRY_CODES: Final[tuple[str, ...]] = (
+    "id", "sg", "my", "ph", "th", "br", "kh", "in", "ru",
+    "us", "ca", "de", "mx", "tr", "gb", "vn", "sa",
+)
+PROVIDERS: Final[tuple[str, ...]] = ("unipin", "codashop", "smile", "lapak", "razer")
+PACK_SIZES: Final[tuple[int, ...]] = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+STATUSES: Final[tuple[str, str]] = ("available", "unavailable")
+# Product fields in API order; products are kept as lists in this order to save memory
+PRODUCT_FIELDS: Final[tuple[str, ...]] = (
+    "code",
+    "category_code",
+    "name",
+    "provider_code",
+    "price",
+    "process_time",
+    "country_code",
+    "status",
+)
+PRICE: Final[int] = PRODUCT_FIELDS.index("price")
+STATUS: Final[int] = PRODUCT_FIELDS.index("status")
+
+
+def game_prefixes(count: int) -> list[str]:
+    return [f"G{i:03d}" for i in range(count)]
+
+
+def split_sizes(total: int, country_codes: Sequence[str]) -> dict[str, int]:
+    """Spread `total` products evenly over the countries (the first ones get the remainder)."""
+    share, extra = divmod(total, len(country_codes))
+    return {cc: share + (i < extra) for i, cc in enumerate(country_codes)}
+
+
+def generate_products(
+    country_code: str, count: int, games: list[str], rng: random.Random
+) -> list[list[Any]]:
+    """`count` products for one country, each a list of values in PRODUCT_FIELDS order."""
+    products = []
+    for i in range(count):
+        game = games[i % len(games)]
+        pack = rng.choice(PACK_SIZES)
+        products.append(
+            [
+                f"{game}-{country_code.upper()}-{i:06d}",
+                f"{game.lower()}-topup",
+                f"{game} {pack} Diamonds" + (" Bundle" if i % 17 == 0 else ""),
+                rng.choice(PROVIDERS),
+                pack * rng.randint(90, 130) * 10,
+                rng.choice((0, 1, 5, 15, 60)),
+                country_code,
+                STATUSES[0] if rng.random() < 0.9 else STATUSES[1],
+            ]
+        )
+    return products
+
+
+def product_record(product: list[Any]) -> dict[str, Any]:
+    return dict(zip(PRODUCT_FIELDS, product))
+
+
+def churn(
+    products: list[list[Any]],
+    price_rate: float,
+    status_rate: float,
+    rng: random.Random,
+) -> int:
+    """Move prices of ~`price_rate` and flip the status of ~`status_rate` of the products.
+
+    Returns:
+        Number of products changed.
+    """
+    changed = 0
+    for product in products:
+        touched = False
+        if rng.random() < price_rate:
+            product[PRICE] = max(1, int(product[PRICE] * rng.uniform(0.9, 1.1)))
+            touched = True
+        if rng.random() < status_rate:
+            product[STATUS] = STATUSES[product[STATUS] == STATUSES[0]]
+            touched = True
+        changed += touched
+    return changed
@@ -2,9 +2,18 @@ import asyncio
 
 from app.processes import process
 from app import config, logger
+from app.sheet import key_rotation_pool, token_cache
+from app.shared.metrics import start_metrics_server
 
 
 async def run_loop():
+    if config.METRICS_PORT:
+        await start_metrics_server(config.METRICS_HOST, config.METRICS_PORT)
+
+    # Fetch every key's token up front and keep them refreshed ahead of expiry
+    await token_cache.warm_up(key_rotation_pool.keys)
+    token_cache.start_background_refresh(key_rotation_pool.keys)
+
     while True:
         try:
             await process()
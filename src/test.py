@@ -18,7 +18,8 @@ async def main():
         if isinstance(result, BaseException):
             print(f"process: country_code={cc} fetch failed: {result}")
         else:
-            all_products.extend(result)
+            products, _changed = result
+            all_products.extend(products)
 
     print(f"process: total products fetched = {len(all_products)}")
 